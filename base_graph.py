@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-from math import inf
+from distribution import distribute_trains
 
 
 class Station_Line:
@@ -20,17 +20,17 @@ class Station_Line:
             raise TypeError("station1 must be a Station type object")
         elif not isinstance(station2, Station):
             raise TypeError("station1 must be a Station type object")
-        elif station1 not in self.stations:
+        elif self.name not in station1.line_positions:
             raise ValueError("station1 is not on this line")
-        elif station2 not in self.stations:
+        elif self.name not in station2.line_positions:
             raise ValueError("station1 is not on this line")
         if station1 is station2:
             return []
-        start_index = self.stations.index(station1)
-        end_index = self.stations.index(station2)
+        start_index = station1.line_positions[self.name][0]
+        end_index = station2.line_positions[self.name][0]
         if self.circular:
-            alternative_start_index = self.stations.index(station1, 1)
-            alternative_end_index = self.stations.index(station2, 1)
+            alternative_start_index = station1.line_positions[self.name][-1]
+            alternative_end_index = station2.line_positions[self.name][-1]
             if (abs(alternative_start_index - alternative_end_index) <
                     abs(start_index - end_index)):
                 start_index = alternative_start_index
@@ -92,6 +92,7 @@ class Station_Line:
         if isinstance(station, Station):
             if self not in station.connected_lines:
                 station.update_line(self)
+            station.add_position(self.name, len(self.stations))
             self.stations.append(station)
         else:
             raise TypeError("station must be a Station type object")
@@ -111,7 +112,7 @@ class Station_Line:
             raise TypeError("line_name must be a Station_Line type object")
         elif not isinstance(connect_station, Station):
             raise TypeError("connect_station must be a Station type object")
-        if connect_station not in self.stations:
+        if self.name not in connect_station.line_positions:
             raise ValueError("the given station does not belong to this line")
         try:
             self.crossing_lines[line_name].append(connect_station)
@@ -127,23 +128,21 @@ class Station_Line:
             - True if there is no duplicate station or the only duplicate
             is the first and last stations. False otherwise.
         """
-        # Loop through each station
-        for index, station in enumerate(self.stations[:-1]):
-            # Check for duplicate in the rest of the list
-            if station in self.stations[index + 1:]:
-                # Get the index of the duplicate
-                duplicate_index = self.stations.index(
-                    station, index + 1
-                )
+        first_index = {}
+        last_index = len(self.stations) - 1
+        # Loop through each station, remembering where it first appeared
+        for index, station in enumerate(self.stations):
+            if station in first_index:
                 """
-                If the index of the duplicate is not the last index or the
-                index of the current station is not 0, return False
+                If the duplicate is not the last station or the first
+                appearance is not at index 0, return False
                 """
-                if duplicate_index == len(self.stations) - 1 and not index:
-                    self.circular = True
-                # Else the line is circular
-                else:
+                if first_index[station] or index != last_index:
                     return False
+                # Else the line is circular
+                self.circular = True
+            else:
+                first_index[station] = index
         return True
 
     def __str__(self):
@@ -158,14 +157,14 @@ class Station:
         if not isinstance(name, str):
             raise TypeError("name must be a str type object")
         self.name = name
-        self.trains = []
         self.connected_lines = []
         self.is_start_end_station = False
         self.is_intersection = False
-        self.over = 0
-        self.occupied = False
         self.pos = [200, 200]
         self.located = False
+        # Line name -> indexes of the station on that line, two for the
+        # first station of a circular line
+        self.line_positions = {}
 
     def update_line(self, new_line):
         """
@@ -178,9 +177,43 @@ class Station:
             for line in self.connected_lines:
                 line.add_crossing_line(new_line.name, self)
             self.connected_lines.append(new_line)
+            self.is_intersection = len(self.connected_lines) > 1
         else:
             raise TypeError("new_line must be a Station_Line type object")
 
+    def add_position(self, line_name, index):
+        """
+        Record an index at which the station appears on a line
+
+        Input:
+            - line_name: a str type object represents the name of the line
+            - index: an int type object represents the index of the station
+        """
+        if not isinstance(line_name, str):
+            raise TypeError("line_name must be a str type object")
+        elif not isinstance(index, int):
+            raise TypeError("index must be an int type object")
+        try:
+            self.line_positions[line_name].append(index)
+        except KeyError:
+            self.line_positions[line_name] = [index]
+
+    def get_index_on_line(self, line_name):
+        """
+        Get the index of the station on a line, the first one if the
+        station appears twice on a circular line
+
+        Input:
+            - line_name: a str type object represents the name of the line
+
+        Output:
+            - the index of the station, None if it is not on that line
+        """
+        try:
+            return self.line_positions[line_name][0]
+        except KeyError:
+            return None
+
     def get_conn_lines(self):
         return self.connected_lines
 
@@ -230,22 +263,75 @@ class Base_Map:
         self.start_station = None
         self.starting_line = None
         self.end_station = None
+        # Hashed indexes, kept in step with self.lines by add_line
+        self.line_ids = {}
+        self.station_index = {}
+        # Changes made during operation, see close_station and
+        # suspend_line
+        self.closed_stations = set()
+        self.suspended_lines = set()
+        self.listeners = []
 
     def add_line(self, line):
         """
-        Add a line into the map
+        Add a line into the map and index it with its stations
 
         Input:
             - line: a Station_Line type object
         """
         if isinstance(line, Station_Line):
+            self.line_ids[line.name] = len(self.lines)
             self.lines.append(line)
+            for station in line.get_stations():
+                self.station_index.setdefault(station.name, station)
         else:
             raise TypeError("line must be a Station_Line object")
 
     def get_all_lines(self):
         return self.lines
 
+    def get_line_id(self, line_name):
+        """
+        Get the integer handle of a line, usable with get_line_by_id and
+        get_station_by_handle
+
+        Input:
+            - line_name: a str type object represent the line's name
+
+        Output:
+            - the handle of the line, None if there is no line with such name
+        """
+        if not isinstance(line_name, str):
+            raise TypeError("line_name must be a str type object")
+        return self.line_ids.get(line_name)
+
+    def get_line_by_id(self, line_id):
+        """
+        Get a line from its integer handle
+
+        Input:
+            - line_id: an int type object returned by get_line_id
+        """
+        if not isinstance(line_id, int):
+            raise TypeError("line_id must be an int type object")
+        return self.lines[line_id]
+
+    def get_station_by_handle(self, line_id, station_index):
+        """
+        Get a station from the integer handle of its line and its index,
+        without any name lookup
+
+        Input:
+            - line_id: an int type object returned by get_line_id
+            - station_index: an int type object represent the index of the
+            station on the line
+        """
+        if not isinstance(line_id, int):
+            raise TypeError("line_id must be an int type object")
+        elif not isinstance(station_index, int):
+            raise TypeError("station_index must be an int type object")
+        return self.lines[line_id].stations[station_index]
+
     def get_line(self, line_name):
         """
         Get a certain line
@@ -259,10 +345,10 @@ class Base_Map:
         """
         if not isinstance(line_name, str):
             raise TypeError("line_name must be a str type object")
-        for line in self.lines:
-            if line.name == line_name:
-                return line
-        return None
+        try:
+            return self.lines[self.line_ids[line_name]]
+        except KeyError:
+            return None
 
     def get_station_by_line(self, line_name, station_index):
         """
@@ -311,10 +397,7 @@ class Base_Map:
             return designated_line.get_station_by_name(station_name)
         # Else search all stations
         elif line_name is None:
-            for line in self.lines:
-                result = line.get_station_by_name(station_name)
-                if result:
-                    return result
+            return self.station_index.get(station_name)
         else:
             raise TypeError("station_name must be a str type object")
         return None
@@ -323,12 +406,7 @@ class Base_Map:
         """
         Get the list of all stations in the map
         """
-        return_list = []
-        # Get all the stations on each line and merge them together
-        for line in self.lines:
-            return_list.extend(line.get_stations())
-        # Remove duplicate
-        return list(set(return_list))
+        return list(self.station_index.values())
 
     def update_start_end_station(self, line_name, station_index, end=False):
         """
@@ -377,22 +455,120 @@ class Base_Map:
             )
 
     def distribute_road(self, paths, total_cost_dict, extra_cost_dict):
-        def get_total_cost(path):
-            return total_cost_dict[path]
+        """
+        Send every train along the path where it arrives first. The trains
+        on the same path share that path object.
 
+        Input:
+            - paths: a list of paths, used as the keys of the dicts
+            - total_cost_dict: a dict from each path to the arrival of its
+            next train, updated with the trains sent along it
+            - extra_cost_dict: a dict from each path to its extra cost
+        """
         if not isinstance(paths, list):
             raise TypeError("paths must be a list type object")
         elif not isinstance(total_cost_dict, dict):
             raise TypeError("total_cost_dict must be a dict type object")
         elif not isinstance(extra_cost_dict, dict):
             raise TypeError("extra_cost_dict must be a dict type object")
-        for train in self.trains:
-            designated_path = min(paths, key=get_total_cost)
-            train.path = designated_path
-            total_cost_dict[designated_path] += (
-                2 if extra_cost_dict[designated_path] > 0
-                else 1
-            )
+        increments = [
+            2 if extra_cost_dict[path] > 0 else 1 for path in paths
+        ]
+        assignments, _ = distribute_trains(
+            [total_cost_dict[path] for path in paths],
+            increments,
+            len(self.trains)
+        )
+        for train, index in zip(self.trains, assignments):
+            train.path = paths[index]
+        for index in assignments:
+            total_cost_dict[paths[index]] += increments[index]
+
+    def add_listener(self, listener):
+        """
+        Register a function called as listener(event, name) after every
+        change made by close_station, reopen_station, suspend_line and
+        resume_line, the event being the name of the method
+        """
+        if not callable(listener):
+            raise TypeError("listener must be callable")
+        self.listeners.append(listener)
+
+    def notify(self, event, name):
+        for listener in self.listeners:
+            listener(event, name)
+
+    def close_station(self, station_name):
+        """
+        Close a station, no train can go through it until it is reopened
+
+        Input:
+            - station_name: a str type object represents the name of the
+            station
+
+        Output:
+            - whether the station was open
+        """
+        if not isinstance(station_name, str):
+            raise TypeError("station_name must be a str type object")
+        elif station_name not in self.station_index:
+            raise ValueError("Station doesn't exist")
+        if station_name in self.closed_stations:
+            return False
+        self.closed_stations.add(station_name)
+        self.notify("close_station", station_name)
+        return True
+
+    def reopen_station(self, station_name):
+        """
+        Reopen a station closed by close_station
+
+        Output:
+            - whether the station was closed
+        """
+        if not isinstance(station_name, str):
+            raise TypeError("station_name must be a str type object")
+        if station_name not in self.closed_stations:
+            return False
+        self.closed_stations.remove(station_name)
+        self.notify("reopen_station", station_name)
+        return True
+
+    def suspend_line(self, line_name):
+        """
+        Suspend a line, no train can ride it or transfer to it until it
+        is resumed. Its stations stay open for the other lines.
+
+        Input:
+            - line_name: a str type object represents the name of the line
+
+        Output:
+            - whether the line was running
+        """
+        if not isinstance(line_name, str):
+            raise TypeError("line_name must be a str type object")
+        elif line_name not in self.line_ids:
+            raise ValueError("Line doesn't exist")
+        if line_name in self.suspended_lines:
+            return False
+        self.suspended_lines.add(line_name)
+        self.notify("suspend_line", line_name)
+        return True
+
+    def resume_line(self, line_name):
+        """
+        Resume a line suspended by suspend_line
+
+        Output:
+            - whether the line was suspended
+        """
+        if not isinstance(line_name, str):
+            raise TypeError("line_name must be a str type object")
+        if line_name not in self.suspended_lines:
+            return False
+        self.suspended_lines.remove(line_name)
+        self.notify("resume_line", line_name)
+        return True
 
     def __str__(self):
         return "Base_Map(\n    %s\n)\nStart=%s\nEnd=%s" % (
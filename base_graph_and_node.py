@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-from math import inf
+from distribution import distribute_trains
 
 
 class Station_Line:
@@ -190,16 +190,27 @@ class Train:
         self.station = station
         self.line = starting_line
         self._train_path = None
+        self._path_offset = 0
         self.target = None
 
-    def update_path(self, train_path):
-        if not isinstance(train_path, list):
-            raise TypeError("train_path must be a list type object")
+    def update_path(self, train_path, offset=0):
+        """Give the train a path to follow. The path is only read, so
+        every train sent along the same path can share it.
+
+        Args:
+            train_path (tuple): The stations the train goes through
+            offset (int): The index of the first station to go to
+        """
+        if not isinstance(train_path, (list, tuple)):
+            raise TypeError("train_path must be a list or tuple type object")
+        elif not isinstance(offset, int):
+            raise TypeError("offset must be an int type object")
         elif any([not isinstance(item, Station) for item in train_path]):
             raise ValueError(
                 "train_path must contain only Station type objects"
             )
         self._train_path = train_path
+        self._path_offset = offset
 
     def move(self):
         def move_to_target_station():
@@ -213,12 +224,14 @@ class Train:
                 self.station.connected_lines
             )
 
-        if not self._train_path:
+        if (not self._train_path or
+                self._path_offset >= len(self._train_path)):
             return
         current_station = self.station
         target_station = self.target
         if current_station is target_station or not target_station:
-            self.target = self._train_path.pop(0)
+            self.target = self._train_path[self._path_offset]
+            self._path_offset += 1
             shared_lines = get_shared_line(
                 self.target.connected_lines,
                 self.line
@@ -403,15 +416,6 @@ class Base_Map:
                 the raod, the second element is the cost of the cost and
                 the third element is whether the path has extra cost
         """
-        def get_minimum_cost_path_pair():
-            minimum_index = None
-            minimum_cost = inf
-            for index, pair in enumerate(path_cost_list):
-                if pair[1] < minimum_cost:
-                    minimum_index = index
-                    minimum_cost = pair[1]
-            return path_cost_list[minimum_index]
-
         if not isinstance(path_cost_list, list):
             raise TypeError("paths must be a list type object")
         elif not all(
@@ -424,13 +428,23 @@ class Base_Map:
                 ):
             raise ValueError("Invalid value in path_cost_list")
         try:
+            # Every train on a path shares it, starting after its first
+            # station
             self.possible_paths = [
-                item[0] for item in path_cost_list
+                tuple(item[0]) for item in path_cost_list
             ]
-            for train in self.trains:
-                minimum_pair = get_minimum_cost_path_pair()
-                train.update_path(minimum_pair[0][1:])
-                minimum_pair[1] += 2 if minimum_pair[2] else 1
+            assignments, _ = distribute_trains(
+                [item[1] for item in path_cost_list],
+                [2 if item[2] else 1 for item in path_cost_list],
+                len(self.trains)
+            )
+            for train, index in zip(self.trains, assignments):
+                train.update_path(self.possible_paths[index], 1)
+            counts = [0] * len(path_cost_list)
+            for index in assignments:
+                counts[index] += 1
+            for count, item in zip(counts, path_cost_list):
+                item[1] += count * (2 if item[2] else 1)
         except (ValueError, AttributeError, IndexError):
             return
 
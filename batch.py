@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+from engine import STRATEGIES, Simulation_Engine, Simulation_State
+from network import compile_network
+from read_input import load_map
+from utility import parse_location, print_error_message
+from concurrent.futures import ProcessPoolExecutor
+from argparse import ArgumentParser
+from sys import stderr, stdout
+from time import perf_counter
+import csv
+import json
+
+# The network of the worker, set once by initialize_worker
+_network = None
+
+
+def read_scenarios(file_name):
+    """
+    Read scenarios from a CSV file with the columns start, end, trains
+    and optionally id and strategy, or from a JSONL file with objects
+    holding the same keys. Locations are written as in the map files.
+
+    Output:
+        - a list of dict type objects with the keys id, start, end,
+        trains and strategy
+    """
+    if not isinstance(file_name, str):
+        raise TypeError("file_name must be a str type object")
+    with open(file_name, "r", newline="") as scenario_file:
+        if file_name.endswith(".jsonl"):
+            rows = [json.loads(line) for line in scenario_file
+                    if line.strip()]
+        else:
+            rows = list(csv.DictReader(scenario_file))
+    scenarios = []
+    for number, row in enumerate(rows):
+        amount_of_trains = int(row["trains"])
+        if amount_of_trains < 0:
+            raise ValueError("the trains of scenario %s must not be negative"
+                             % (row.get("id") or number))
+        scenarios.append({
+            "id": row.get("id") or number,
+            "start": row["start"],
+            "end": row["end"],
+            "trains": amount_of_trains,
+            "strategy": row.get("strategy") or None
+        })
+    return scenarios
+
+
+def initialize_worker(network):
+    global _network
+    _network = network
+
+
+def solve_scenario(scenario):
+    """
+    Solve one scenario with the network of the worker
+
+    Output:
+        - a dict type object with the scenario, the turns, the lower
+        bound and the seconds taken, or the error that stopped it
+    """
+    result = dict(scenario)
+    start_time = perf_counter()
+    try:
+        start_node = _network.get_node(*parse_location(scenario["start"]))
+        end_node = _network.get_node(*parse_location(scenario["end"]))
+        if start_node is None or end_node is None:
+            raise ValueError("no such station on the line")
+        engine = Simulation_Engine(Simulation_State(
+            _network, start_node, end_node, scenario["trains"]
+        ))
+        if scenario["strategy"] is None:
+            results = engine.benchmark(stop_at_bound=True)
+            best = results[0] if results else None
+        else:
+            best = engine.run(scenario["strategy"])
+        if best is None:
+            raise ValueError("END can not be reached")
+        result["strategy"] = best.strategy
+        result["turns"] = best.turns
+        result["lower_bound"] = best.lower_bound.value
+        result["optimal"] = best.is_optimal()
+    except (KeyError, TypeError, ValueError) as error:
+        result["error"] = str(error)
+    result["elapsed"] = round(perf_counter() - start_time, 6)
+    return result
+
+
+def run_batch(network, scenarios, workers=None, chunk_size=4):
+    """
+    Solve scenarios on a process pool. The network is sent once to each
+    worker when it starts, the tasks only carry their scenario.
+
+    Input:
+        - network: a Network type object
+        - scenarios: a list of scenarios as given by read_scenarios
+        - workers: an int type object, the amount of processes, the
+        amount of CPUs if None
+        - chunk_size: an int type object, the scenarios sent together
+
+    Output:
+        - a generator of the results of solve_scenario, in the order of
+        the scenarios
+    """
+    if workers == 1:
+        initialize_worker(network)
+        yield from map(solve_scenario, scenarios)
+        return
+    with ProcessPoolExecutor(workers, initializer=initialize_worker,
+                             initargs=(network,)) as executor:
+        yield from executor.map(solve_scenario, scenarios,
+                                chunksize=chunk_size)
+
+
+def main():
+    parser = ArgumentParser(description="Solve many scenarios of one map")
+    parser.add_argument("file_name", help="the map file")
+    parser.add_argument("scenarios", help="a .csv or .jsonl scenario file")
+    parser.add_argument("--output", help="the JSONL file written, the "
+                        "standard output if not given")
+    parser.add_argument("--workers", type=int, help="the amount of "
+                        "processes, the amount of CPUs if not given")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES),
+                        help="the strategy of the scenarios without one")
+    args = parser.parse_args()
+    start_time = perf_counter()
+    network = compile_network(load_map(args.file_name)[0])
+    try:
+        scenarios = read_scenarios(args.scenarios)
+    except (KeyError, ValueError) as error:
+        print_error_message("Invalid scenario file: %s" % error)
+    for scenario in scenarios:
+        if scenario["strategy"] is None:
+            scenario["strategy"] = args.strategy
+    output = stdout if args.output is None else open(args.output, "w")
+    try:
+        for result in run_batch(network, scenarios, args.workers):
+            output.write(json.dumps(result) + "\n")
+    finally:
+        if output is not stdout:
+            output.close()
+    print("%s scenarios in %.3fs" % (len(scenarios),
+                                     perf_counter() - start_time),
+          file=stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+from network import Network
+from distance import Distance_Table, UNREACHABLE
+from flow import Flow_Graph
+
+
+class Lower_Bound:
+    """
+    Lower bounds on the amount of turns any schedule needs
+
+    Attributes:
+        shortest (int): the turns of the shortest route, the first train
+            can not arrive earlier
+        capacity (int): the most trains that can arrive in one turn, the
+            size of the minimum cut between START and END, at most the
+            amount of trains
+        cut_bound (int): the bound given by shortest and capacity, every
+            turn after the first arrival bringing at most capacity trains
+        pipeline_bound (int): the bound given by the trains following
+            each other along disjoint routes, whose lengths add up to the
+            cheapest possible
+        value (int): the best of the bounds, 0 without trains since
+            none has to arrive
+    """
+    def __init__(self, shortest, capacity, cut_bound, pipeline_bound):
+        self.shortest = shortest
+        self.capacity = capacity
+        self.cut_bound = cut_bound
+        self.pipeline_bound = pipeline_bound
+        if capacity:
+            self.value = max(shortest, cut_bound, pipeline_bound)
+        else:
+            self.value = 0
+
+    def get_gap(self, turns):
+        """
+        Get how far a schedule may be from the optimum, as a fraction of
+        the bound
+        """
+        return (turns - self.value) / self.value if self.value else 0.0
+
+    def __str__(self):
+        return ("Lower_Bound(value=%s, shortest=%s, capacity=%s, "
+                "cut_bound=%s, pipeline_bound=%s)" % (
+                    self.value, self.shortest, self.capacity,
+                    self.cut_bound, self.pipeline_bound
+                ))
+
+
+def estimate_lower_bound(network, start_node, end_node, amount_of_trains):
+    """
+    Estimate the least amount of turns to bring the trains from START to
+    END, every node holding at most one train per turn.
+
+    A flow of v trains per turn over routes of total length C brings
+    v * (T + 1) - C trains by turn T, and the most trains that can
+    arrive by turn T is the best of these over the cheapest flows of
+    each value, which successive shortest paths go through in order.
+
+    Input:
+        - network: a Network type object
+        - start_node, end_node: int type objects represent START and END
+        - amount_of_trains: an int type object
+
+    Output:
+        - a Lower_Bound type object, None if END can not be reached
+    """
+    if not isinstance(network, Network):
+        raise TypeError("network must be a Network type object")
+    elif not isinstance(amount_of_trains, int):
+        raise TypeError("amount_of_trains must be an int type object")
+    shortest = Distance_Table(network, end_node).get_distance(start_node)
+    if shortest == UNREACHABLE:
+        return None
+    if amount_of_trains <= 0:
+        return Lower_Bound(shortest, 0, 0, 0)
+    node_station = network.node_station
+    free_stations = (node_station[start_node], node_station[end_node])
+    # Node n is entered at vertex 2n and left at vertex 2n + 1
+    graph = Flow_Graph(2 * network.node_count + 1)
+    sink = 2 * network.node_count
+    for node in range(network.node_count):
+        station_id = node_station[node]
+        graph.add_edge(
+            2 * node, 2 * node + 1,
+            amount_of_trains if station_id in free_stations else 1
+        )
+        if station_id == free_stations[1]:
+            graph.add_edge(2 * node + 1, sink, amount_of_trains)
+            continue
+        for next_node in network.get_neighbours(node):
+            graph.add_edge(2 * node + 1, 2 * next_node, amount_of_trains, 1)
+    capacity = 0
+    pipeline_bound = None
+    for value, cost in graph.successive_shortest_paths(
+            2 * start_node, sink, amount_of_trains):
+        capacity = value
+        # The first turn T with value * (T + 1) - cost >= the trains
+        turns = -(-(amount_of_trains + cost) // value) - 1
+        if pipeline_bound is None or turns < pipeline_bound:
+            pipeline_bound = turns
+    cut_bound = shortest + -(-amount_of_trains // capacity) - 1
+    return Lower_Bound(shortest, capacity, cut_bound, pipeline_bound)
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+from network import Network
+from map_cache import hash_file, read_array, write_array
+from array import array
+from heapq import heapify, heappush, heappop
+import struct
+
+MAGIC = b"MRH\x01"
+HIERARCHY_EXTENSION = ".ch"
+HEADER = struct.Struct("<4s32sI")
+# The most nodes a witness search settles before it gives up, which
+# only adds shortcuts that were not needed
+WITNESS_LIMIT = 64
+
+
+class Route_Hierarchy:
+    """
+    A contraction hierarchy over the nodes of a Network, answering
+    shortest route queries with two small searches that only go up the
+    ranks of the nodes instead of a breadth first search over the map.
+
+    Every node is given a rank, and the edges left over are the upward
+    ones: the edges going out of node n to higher ranked nodes are
+    up_targets[up_offsets[n]:up_offsets[n + 1]], and the edges coming
+    into node n from higher ranked nodes are
+    down_sources[down_offsets[n]:down_offsets[n + 1]]. The weights are
+    turns, rides and transfers being one each as in the Network, and a
+    shortcut stands for the route through its middle node, -1 for the
+    edges of the Network itself.
+    """
+    def __init__(self, network, rank, up_offsets, up_targets, up_weights,
+                 up_middles, down_offsets, down_sources, down_weights,
+                 down_middles):
+        if not isinstance(network, Network):
+            raise TypeError("network must be a Network type object")
+        self.network = network
+        self.rank = rank
+        self.up_offsets = up_offsets
+        self.up_targets = up_targets
+        self.up_weights = up_weights
+        self.up_middles = up_middles
+        self.down_offsets = down_offsets
+        self.down_sources = down_sources
+        self.down_weights = down_weights
+        self.down_middles = down_middles
+        # The middle node of every shortcut, to unpack the paths
+        self.middles = {}
+        for node in range(network.node_count):
+            for edge in range(up_offsets[node], up_offsets[node + 1]):
+                if up_middles[edge] >= 0:
+                    self.middles[node, up_targets[edge]] = up_middles[edge]
+            for edge in range(down_offsets[node], down_offsets[node + 1]):
+                if down_middles[edge] >= 0:
+                    self.middles[down_sources[edge], node] = (
+                        down_middles[edge]
+                    )
+
+    def search(self, sources, offsets, targets, weights):
+        """
+        Run one side of a query: a Dijkstra search from sources that only
+        follows the given upward edges
+
+        Output:
+            - a dict from every reached node to its (turns, parent) pair
+        """
+        reached = {node: (0, None) for node in sources}
+        heap = [(0, node) for node in sources]
+        heapify(heap)
+        settled = set()
+        while heap:
+            turns, node = heappop(heap)
+            if node in settled:
+                continue
+            settled.add(node)
+            for edge in range(offsets[node], offsets[node + 1]):
+                next_node = targets[edge]
+                next_turns = turns + weights[edge]
+                if (next_node not in reached or
+                        next_turns < reached[next_node][0]):
+                    reached[next_node] = (next_turns, node)
+                    heappush(heap, (next_turns, next_node))
+        return reached
+
+    def find_meeting(self, source, target):
+        if not isinstance(source, int):
+            raise TypeError("source must be an int type object")
+        elif not isinstance(target, int):
+            raise TypeError("target must be an int type object")
+        network = self.network
+        forward = self.search(
+            (source,), self.up_offsets, self.up_targets, self.up_weights
+        )
+        # Every node of the target station counts as reached
+        backward = self.search(
+            network.get_station_nodes(network.node_station[target]),
+            self.down_offsets, self.down_sources, self.down_weights
+        )
+        best = None
+        for node, (turns, _) in forward.items():
+            if node in backward:
+                total = turns + backward[node][0]
+                if best is None or total < best[0]:
+                    best = (total, node)
+        return best, forward, backward
+
+    def find_distance(self, source, target):
+        """
+        Find the least turns from a node to the station of another node
+
+        Input:
+            - source: an int type object represents the node to start at
+            - target: an int type object represents the node to reach,
+            every node of the same station counts as reached
+
+        Output:
+            - the turns, None if the station can not be reached
+        """
+        best, _, _ = self.find_meeting(source, target)
+        return None if best is None else best[0]
+
+    def unpack(self, node, next_node, path):
+        """
+        Add the nodes after node up to next_node to path, going through
+        the middle nodes of the shortcuts
+        """
+        stack = [(node, next_node)]
+        while stack:
+            node, next_node = stack.pop()
+            middle = self.middles.get((node, next_node))
+            if middle is None:
+                path.append(next_node)
+            else:
+                stack.append((middle, next_node))
+                stack.append((node, middle))
+
+    def find_path(self, source, target):
+        """
+        Find a shortest path between two nodes, like
+        path_finding.find_shortest_path
+
+        Output:
+            - the list of nodes from source to the reached node, None if no
+            path exists
+        """
+        best, forward, backward = self.find_meeting(source, target)
+        if best is None:
+            return None
+        upward = []
+        node = best[1]
+        while node is not None:
+            upward.append(node)
+            node = forward[node][1]
+        upward.reverse()
+        node = best[1]
+        downward = [node]
+        while backward[node][1] is not None:
+            node = backward[node][1]
+            downward.append(node)
+        path = [source]
+        for stops in (upward, downward):
+            for index in range(len(stops) - 1):
+                self.unpack(stops[index], stops[index + 1], path)
+        return path
+
+    def find_route(self, start_info, end_info):
+        """
+        Find a shortest path between two (line name, index) pairs, like
+        path_finding.find_shortest_route
+
+        Output:
+            - the list of (line name, index) pairs of the path, None if no
+            path exists
+        """
+        source = self.network.get_node(*start_info)
+        target = self.network.get_node(*end_info)
+        if source is None or target is None:
+            raise ValueError("Station doesn't exist")
+        path = self.find_path(source, target)
+        if path is None:
+            return None
+        return [self.network.get_location(node) for node in path]
+
+    def get_shortcut_count(self):
+        return sum(middle >= 0 for middle in self.up_middles) + sum(
+            middle >= 0 for middle in self.down_middles
+        )
+
+    def __len__(self):
+        return len(self.up_targets) + len(self.down_sources)
+
+
+def find_witnesses(outgoing, source, skipped, limit):
+    """
+    Find the turns from source to the nodes that are not contracted yet
+    without going through skipped, up to limit turns and WITNESS_LIMIT
+    settled nodes
+    """
+    reached = {source: 0}
+    heap = [(0, source)]
+    settled = 0
+    while heap and settled < WITNESS_LIMIT:
+        turns, node = heappop(heap)
+        if turns > reached[node]:
+            continue
+        settled += 1
+        for next_node, weight in outgoing[node].items():
+            next_turns = turns + weight
+            if (next_node != skipped and next_turns <= limit and
+                    next_turns < reached.get(next_node, next_turns + 1)):
+                reached[next_node] = next_turns
+                heappush(heap, (next_turns, next_node))
+    return reached
+
+
+def get_shortcuts(outgoing, incoming, node):
+    """
+    Get the shortcuts needed to contract a node: a route through it that
+    no other route of at most the same turns can replace
+
+    Output:
+        - a list of (source, target, turns) tuples
+    """
+    shortcuts = []
+    if not outgoing[node]:
+        return shortcuts
+    limit = max(outgoing[node].values())
+    for source, in_weight in incoming[node].items():
+        reached = find_witnesses(outgoing, source, node, in_weight + limit)
+        for target, out_weight in outgoing[node].items():
+            if target == source:
+                continue
+            turns = in_weight + out_weight
+            if reached.get(target, turns + 1) > turns:
+                shortcuts.append((source, target, turns))
+    return shortcuts
+
+
+def build_hierarchy(network):
+    """
+    Contract the nodes of a network one by one, the ones adding the
+    fewest shortcuts first, and keep the edges going up the ranks
+
+    Input:
+        - network: a Network type object
+
+    Output:
+        - a Route_Hierarchy type object
+    """
+    if not isinstance(network, Network):
+        raise TypeError("network must be a Network type object")
+    node_count = network.node_count
+    outgoing = [{} for _ in range(node_count)]
+    incoming = [{} for _ in range(node_count)]
+    middles = {}
+    for node in range(node_count):
+        for next_node in network.get_neighbours(node):
+            outgoing[node][next_node] = 1
+            incoming[next_node][node] = 1
+    contracted_neighbours = [0] * node_count
+
+    def get_priority(node):
+        return (len(get_shortcuts(outgoing, incoming, node)) -
+                len(outgoing[node]) - len(incoming[node]) +
+                contracted_neighbours[node])
+
+    heap = [(get_priority(node), node) for node in range(node_count)]
+    heapify(heap)
+    rank = array("i", bytes(4 * node_count))
+    upward = [None] * node_count
+    downward = [None] * node_count
+    next_rank = 0
+    while heap:
+        _, node = heappop(heap)
+        # The priority may be out of date, contract the node only if it
+        # is still the lowest
+        priority = get_priority(node)
+        if heap and priority > heap[0][0]:
+            heappush(heap, (priority, node))
+            continue
+        rank[node] = next_rank
+        next_rank += 1
+        for source, target, turns in get_shortcuts(outgoing, incoming, node):
+            if turns < outgoing[source].get(target, turns + 1):
+                outgoing[source][target] = turns
+                incoming[target][source] = turns
+                middles[source, target] = node
+        upward[node] = [
+            (target, weight, middles.get((node, target), -1))
+            for target, weight in outgoing[node].items()
+        ]
+        downward[node] = [
+            (source, weight, middles.get((source, node), -1))
+            for source, weight in incoming[node].items()
+        ]
+        for target in outgoing[node]:
+            del incoming[target][node]
+            contracted_neighbours[target] += 1
+        for source in incoming[node]:
+            del outgoing[source][node]
+            contracted_neighbours[source] += 1
+        outgoing[node] = {}
+        incoming[node] = {}
+    arrays = []
+    for edges in (upward, downward):
+        offsets = array("i", [0])
+        nodes = array("i")
+        weights = array("i")
+        edge_middles = array("i")
+        for node_edges in edges:
+            for next_node, weight, middle in node_edges:
+                nodes.append(next_node)
+                weights.append(weight)
+                edge_middles.append(middle)
+            offsets.append(len(nodes))
+        arrays += [offsets, nodes, weights, edge_middles]
+    return Route_Hierarchy(network, rank, *arrays)
+
+
+def get_hierarchy_name(file_name):
+    """
+    Get the name of the hierarchy file that belongs to a map file, placed
+    next to it
+    """
+    if not isinstance(file_name, str):
+        raise TypeError("file_name must be a str type object")
+    return file_name + HIERARCHY_EXTENSION
+
+
+def write_hierarchy(hierarchy_name, digest, hierarchy):
+    """
+    Write a hierarchy to a file, with the hash of the map file it was
+    built from
+    """
+    if not isinstance(hierarchy, Route_Hierarchy):
+        raise TypeError("hierarchy must be a Route_Hierarchy type object")
+    with open(hierarchy_name, "wb") as output_file:
+        output_file.write(HEADER.pack(
+            MAGIC, digest, hierarchy.network.node_count
+        ))
+        for items in (hierarchy.rank, hierarchy.up_offsets,
+                      hierarchy.up_targets, hierarchy.up_weights,
+                      hierarchy.up_middles, hierarchy.down_offsets,
+                      hierarchy.down_sources, hierarchy.down_weights,
+                      hierarchy.down_middles):
+            write_array(output_file, items)
+
+
+def read_hierarchy(hierarchy_name, digest, network):
+    """
+    Read a hierarchy written by write_hierarchy
+
+    Output:
+        - a Route_Hierarchy type object, None if the file is missing,
+        stale or damaged
+    """
+    try:
+        with open(hierarchy_name, "rb") as input_file:
+            magic, cached_digest, node_count = HEADER.unpack(
+                input_file.read(HEADER.size)
+            )
+            if (magic != MAGIC or cached_digest != digest or
+                    node_count != network.node_count):
+                return None
+            arrays = [read_array(input_file) for _ in range(9)]
+    except (OSError, EOFError, struct.error, ValueError):
+        return None
+    if (len(arrays[0]) != node_count or
+            len(arrays[1]) != node_count + 1 or
+            len(arrays[5]) != node_count + 1):
+        return None
+    return Route_Hierarchy(network, *arrays)
+
+
+def load_hierarchy(file_name, network):
+    """
+    Load the hierarchy of a map from the file next to it, building and
+    writing it when it is missing or the map file changed since
+
+    Input:
+        - file_name: a str type object represents the name of the map file
+        - network: a Network type object compiled from that map
+
+    Output:
+        - a Route_Hierarchy type object
+    """
+    if not isinstance(network, Network):
+        raise TypeError("network must be a Network type object")
+    digest = hash_file(file_name)
+    hierarchy_name = get_hierarchy_name(file_name)
+    hierarchy = read_hierarchy(hierarchy_name, digest, network)
+    if hierarchy is None:
+        hierarchy = build_hierarchy(network)
+        try:
+            write_hierarchy(hierarchy_name, digest, hierarchy)
+        except OSError:
+            pass
+    return hierarchy
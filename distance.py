@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+from network import Network
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+
+UNREACHABLE = 2 ** 31 - 1
+
+
+class Distance_Table:
+    """
+    The number of turns from every node of a network to the END station,
+    computed once by a breadth first search that runs backwards from END.
+
+    Stations and lines can be blocked and unblocked afterwards. The table
+    is then repaired only around the nodes whose distance actually
+    changes, instead of being computed again. A node is blocked as long
+    as its station or its line is.
+    """
+    def __init__(self, network, end_node, blocked_stations=(),
+                 blocked_lines=()):
+        """
+        Input:
+            - network: a Network type object
+            - end_node: an int type object represents the node of END, every
+            node of the same station counts as arrived
+            - blocked_stations: the ids of the stations that are blocked
+            from the start
+            - blocked_lines: the ids of the lines that are blocked from the
+            start
+        """
+        if not isinstance(network, Network):
+            raise TypeError("network must be a Network type object")
+        elif not isinstance(end_node, int):
+            raise TypeError("end_node must be an int type object")
+        self.network = network
+        self.end_station = network.node_station[end_node]
+        self.blocked = bytearray(network.station_count)
+        self.blocked_lines = bytearray(len(network.line_names))
+        # The amount of blocked stations and lines every node is on
+        self.blocked_nodes = bytearray(network.node_count)
+        for station_id in blocked_stations:
+            if not self.blocked[station_id]:
+                self.blocked[station_id] = 1
+                for node in network.get_station_nodes(station_id):
+                    self.blocked_nodes[node] += 1
+        for line_id in blocked_lines:
+            if not self.blocked_lines[line_id]:
+                self.blocked_lines[line_id] = 1
+                for node in self.get_line_nodes(line_id):
+                    self.blocked_nodes[node] += 1
+        self.distances = None
+        self.rebuild()
+
+    def get_line_nodes(self, line_id):
+        line_offsets = self.network.line_offsets
+        return range(line_offsets[line_id], line_offsets[line_id + 1])
+
+    def rebuild(self):
+        """
+        Compute the whole table from scratch
+        """
+        network = self.network
+        self.distances = array("i", [UNREACHABLE]) * network.node_count
+        distances = self.distances
+        queue = deque()
+        blocked_nodes = self.blocked_nodes
+        for node in network.get_station_nodes(self.end_station):
+            if not blocked_nodes[node]:
+                distances[node] = 0
+                queue.append(node)
+        reverse_offsets = network.reverse_offsets
+        reverse_sources = network.reverse_sources
+        while queue:
+            node = queue.popleft()
+            next_distance = distances[node] + 1
+            for edge in range(reverse_offsets[node], reverse_offsets[node + 1]):
+                source = reverse_sources[edge]
+                if (distances[source] > next_distance and
+                        not blocked_nodes[source]):
+                    distances[source] = next_distance
+                    queue.append(source)
+
+    def get_distance(self, node):
+        return self.distances[node]
+
+    def get_next_node(self, node, is_free=None, limit=None):
+        """
+        Get the neighbour of a node that is the closest to END, among
+        the ones that are strictly closer than the node itself
+
+        Input:
+            - node: an int type object represents the current node
+            - is_free: a function that tells whether a node can be
+            entered. Transfers at the same station are always allowed.
+            - limit: an int type object, only the neighbours closer than
+            it are considered instead of the ones closer than the node
+
+        Output:
+            - the chosen node, None if the train has to wait
+        """
+        network = self.network
+        distances = self.distances
+        node_station = network.node_station
+        targets = network.targets
+        best_node = None
+        best_distance = distances[node] if limit is None else limit
+        for edge in range(network.offsets[node], network.offsets[node + 1]):
+            target = targets[edge]
+            if distances[target] < best_distance and (
+                    is_free is None or
+                    node_station[target] == node_station[node] or
+                    is_free(target)):
+                best_node = target
+                best_distance = distances[target]
+        return best_node
+
+    def relax(self, heap):
+        """
+        Propagate the decreased distances of the nodes in the heap
+        to their predecessors
+        """
+        network = self.network
+        distances = self.distances
+        blocked_nodes = self.blocked_nodes
+        reverse_offsets = network.reverse_offsets
+        reverse_sources = network.reverse_sources
+        while heap:
+            distance, node = heappop(heap)
+            if distance > distances[node]:
+                continue
+            for edge in range(reverse_offsets[node], reverse_offsets[node + 1]):
+                source = reverse_sources[edge]
+                if (distances[source] > distance + 1 and
+                        not blocked_nodes[source]):
+                    distances[source] = distance + 1
+                    heappush(heap, (distance + 1, source))
+
+    def get_best_neighbour_distance(self, node):
+        network = self.network
+        best_distance = UNREACHABLE
+        for target in network.get_neighbours(node):
+            if (not self.blocked_nodes[target] and
+                    self.distances[target] < best_distance):
+                best_distance = self.distances[target]
+        return best_distance
+
+    def block_nodes(self, nodes):
+        """
+        Block nodes once more, and repair the distances that depended on
+        the ones that were not blocked yet
+
+        Input:
+            - nodes: the ids of the nodes
+
+        Output:
+            - the amount of nodes whose distance had to be recomputed
+        """
+        network = self.network
+        distances = self.distances
+        blocked_nodes = self.blocked_nodes
+        # Collect the nodes that lose every shortest path, in the order
+        # of their old distance so that the supports are settled first
+        affected = set()
+        heap = []
+        for node in nodes:
+            blocked_nodes[node] += 1
+            if blocked_nodes[node] == 1 and distances[node] != UNREACHABLE:
+                heappush(heap, (distances[node], node))
+        while heap:
+            distance, node = heappop(heap)
+            if node in affected:
+                continue
+            if not blocked_nodes[node] and any(
+                    distances[target] == distance - 1 and
+                    target not in affected and
+                    not blocked_nodes[target]
+                    for target in network.get_neighbours(node)):
+                continue
+            affected.add(node)
+            for source in network.get_predecessors(node):
+                if (distances[source] == distance + 1 and
+                        source not in affected):
+                    heappush(heap, (distance + 1, source))
+        # Give the affected nodes their best distance through the rest
+        # of the table and let it spread among them
+        for node in affected:
+            distances[node] = UNREACHABLE
+        for node in affected:
+            if blocked_nodes[node]:
+                continue
+            best_distance = self.get_best_neighbour_distance(node)
+            if best_distance != UNREACHABLE:
+                distances[node] = best_distance + 1
+                heappush(heap, (best_distance + 1, node))
+        self.relax(heap)
+        return len(affected)
+
+    def unblock_nodes(self, nodes):
+        """
+        Unblock nodes once, and repair the distances that get shorter
+        through the ones that are not blocked anymore
+
+        Input:
+            - nodes: the ids of the nodes
+        """
+        network = self.network
+        distances = self.distances
+        blocked_nodes = self.blocked_nodes
+        heap = []
+        for node in nodes:
+            blocked_nodes[node] -= 1
+        for node in nodes:
+            if blocked_nodes[node]:
+                continue
+            if network.node_station[node] == self.end_station:
+                best_distance = -1
+            else:
+                best_distance = self.get_best_neighbour_distance(node)
+            if best_distance != UNREACHABLE:
+                distances[node] = best_distance + 1
+                heappush(heap, (best_distance + 1, node))
+        self.relax(heap)
+
+    def block_station(self, station_id):
+        """
+        Block a station so that no path goes through it and repair the
+        distances that depended on it
+
+        Input:
+            - station_id: an int type object represents the station
+
+        Output:
+            - the amount of nodes whose distance had to be recomputed
+        """
+        if not isinstance(station_id, int):
+            raise TypeError("station_id must be an int type object")
+        if self.blocked[station_id]:
+            return 0
+        self.blocked[station_id] = 1
+        return self.block_nodes(self.network.get_station_nodes(station_id))
+
+    def unblock_station(self, station_id):
+        """
+        Unblock a station and repair the distances that get shorter
+        through it
+
+        Input:
+            - station_id: an int type object represents the station
+        """
+        if not isinstance(station_id, int):
+            raise TypeError("station_id must be an int type object")
+        if not self.blocked[station_id]:
+            return
+        self.blocked[station_id] = 0
+        self.unblock_nodes(self.network.get_station_nodes(station_id))
+
+    def block_line(self, line_id):
+        """
+        Block every node of a line, trains can not ride it or transfer to
+        it anymore
+
+        Input:
+            - line_id: an int type object represents the line
+
+        Output:
+            - the amount of nodes whose distance had to be recomputed
+        """
+        if not isinstance(line_id, int):
+            raise TypeError("line_id must be an int type object")
+        if self.blocked_lines[line_id]:
+            return 0
+        self.blocked_lines[line_id] = 1
+        return self.block_nodes(self.get_line_nodes(line_id))
+
+    def unblock_line(self, line_id):
+        if not isinstance(line_id, int):
+            raise TypeError("line_id must be an int type object")
+        if not self.blocked_lines[line_id]:
+            return
+        self.blocked_lines[line_id] = 0
+        self.unblock_nodes(self.get_line_nodes(line_id))
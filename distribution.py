@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+from array import array
+from heapq import heapify, heapreplace
+
+# Above this amount of trains only the amount per path is computed
+LARGE_AMOUNT_OF_TRAINS = 1 << 16
+
+
+def check_costs(costs, increments, amount_of_trains):
+    if not isinstance(costs, list):
+        raise TypeError("costs must be a list type object")
+    elif not isinstance(increments, list):
+        raise TypeError("increments must be a list type object")
+    elif len(costs) != len(increments):
+        raise ValueError("costs and increments must have the same length")
+    elif not isinstance(amount_of_trains, int):
+        raise TypeError("amount_of_trains must be an int type object")
+    elif amount_of_trains and not costs:
+        raise ValueError("trains can not be distributed without a path")
+    elif any(increment <= 0 for increment in increments):
+        raise ValueError("increments must be positive")
+
+
+def distribute_trains(costs, increments, amount_of_trains):
+    """
+    Send every train, in order, along the path where it arrives first.
+    The paths are kept in a heap by the arrival of their next train, so
+    each train costs O(log paths) instead of a scan of every path.
+
+    Input:
+        - costs: a list of int type objects, the arrival of the first
+        train on each path
+        - increments: a list of int type objects, how much later each
+        following train on the same path arrives
+        - amount_of_trains: an int type object
+
+    Output:
+        - assignments: an array of the index of the path of every train
+        - predicted_turns: the arrival of the last train
+    """
+    check_costs(costs, increments, amount_of_trains)
+    heap = [(cost, index) for index, cost in enumerate(costs)]
+    heapify(heap)
+    assignments = array("i", bytes(4 * amount_of_trains))
+    predicted_turns = 0
+    for train in range(amount_of_trains):
+        cost, index = heap[0]
+        assignments[train] = index
+        predicted_turns = cost
+        heapreplace(heap, (cost + increments[index], index))
+    return assignments, predicted_turns
+
+
+def count_trains(costs, increments, amount_of_trains):
+    """
+    Get the amount of trains distribute_trains sends along each path,
+    without going through the trains one by one: the last arrival T is
+    the smallest one for which the paths can bring every train by T,
+    found with a binary search.
+
+    Input:
+        - the same as distribute_trains
+
+    Output:
+        - counts: a list of the amount of trains on every path
+        - predicted_turns: the arrival of the last train
+    """
+    check_costs(costs, increments, amount_of_trains)
+    if not amount_of_trains:
+        return [0] * len(costs), 0
+
+    def get_counts(turns):
+        return [
+            (turns - cost) // increment + 1 if turns >= cost else 0
+            for cost, increment in zip(costs, increments)
+        ]
+
+    low = min(costs)
+    high = low + (amount_of_trains - 1) * increments[costs.index(low)]
+    while low < high:
+        middle = (low + high) // 2
+        if sum(get_counts(middle)) >= amount_of_trains:
+            high = middle
+        else:
+            low = middle + 1
+    counts = get_counts(low - 1)
+    remaining = amount_of_trains - sum(counts)
+    # The trains arriving exactly at the last turn, lower paths first
+    for index, cost in enumerate(costs):
+        if not remaining:
+            break
+        if low >= cost and (low - cost) % increments[index] == 0:
+            counts[index] += 1
+            remaining -= 1
+    return counts, low
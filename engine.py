@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+from network import Network
+from bounds import estimate_lower_bound
+from occupancy import Occupancy_Map
+from distance import Distance_Table, UNREACHABLE
+from flow import solve_flow_schedule
+from move_trace import Move_Trace
+from planner import plan_routes
+from reservation import plan_cooperative_routes
+from simulation import simulate_events
+from time import perf_counter
+
+
+class Stalled_Error(ValueError):
+    """
+    Raised when the trains of a strategy block each other for good, so
+    that END is never reached although a route to it exists
+    """
+
+
+class Simulation_State:
+    """
+    The input every strategy works on, shared so that strategies are
+    compared on exactly the same problem
+
+    Attributes:
+        network (Network): the compiled network
+        start_node (int): the node of START
+        end_node (int): the node of END
+        amount_of_trains (int): the amount of trains to bring to END
+        free_stations (tuple): the stations that hold any amount of
+            trains, START and END
+    """
+    def __init__(self, network, start_node, end_node, amount_of_trains):
+        if not isinstance(network, Network):
+            raise TypeError("network must be a Network type object")
+        elif not isinstance(start_node, int):
+            raise TypeError("start_node must be an int type object")
+        elif not isinstance(end_node, int):
+            raise TypeError("end_node must be an int type object")
+        elif not isinstance(amount_of_trains, int):
+            raise TypeError("amount_of_trains must be an int type object")
+        elif amount_of_trains < 0:
+            raise ValueError("amount_of_trains must not be negative")
+        self.network = network
+        self.start_node = start_node
+        self.end_node = end_node
+        self.amount_of_trains = amount_of_trains
+        self.free_stations = (network.node_station[start_node],
+                              network.node_station[end_node])
+        self._end_table = None
+        self._lower_bound = None
+
+    def get_end_table(self):
+        """
+        Get the Distance_Table to END, built once for every strategy
+        """
+        if self._end_table is None:
+            self._end_table = Distance_Table(self.network, self.end_node)
+        return self._end_table
+
+    def get_lower_bound(self):
+        """
+        Get the Lower_Bound of the state, None if END can not be reached
+        """
+        if self._lower_bound is None:
+            self._lower_bound = estimate_lower_bound(
+                self.network, self.start_node, self.end_node,
+                self.amount_of_trains
+            )
+        return self._lower_bound
+
+    def is_reachable(self):
+        return (self.get_end_table().get_distance(self.start_node) !=
+                UNREACHABLE)
+
+    def is_arrived(self):
+        """
+        Tell whether START is END already, every train having arrived
+        before the first turn
+        """
+        return not self.get_end_table().get_distance(self.start_node)
+
+
+class Simulation_Result:
+    """
+    The outcome of a strategy
+
+    Attributes:
+        strategy (str): the name of the strategy
+        turns (int): the amount of turns until every train arrived
+        trace (Move_Trace): the moves of every train, starting at START
+            at turn 0
+        elapsed (float): the seconds the strategy took
+        lower_bound (Lower_Bound): the bound of the state, None if unknown
+    """
+    def __init__(self, strategy, trace, elapsed=0.0, lower_bound=None):
+        self.strategy = strategy
+        self.trace = trace
+        self.turns = trace.get_turns()
+        self.elapsed = elapsed
+        self.lower_bound = lower_bound
+
+    def is_optimal(self):
+        return (self.lower_bound is not None and
+                self.turns <= self.lower_bound.value)
+
+    def __str__(self):
+        text = "strategy=%s, turns=%s, elapsed=%.3fs" % (
+            self.strategy, self.turns, self.elapsed
+        )
+        if self.lower_bound is not None:
+            text += ", lower_bound=%s, gap=%.1f%%" % (
+                self.lower_bound.value,
+                100 * self.lower_bound.get_gap(self.turns)
+            )
+        return "Simulation_Result(%s)" % text
+
+
+def replay_train_paths(state, paths, assignments):
+    """
+    Run the trains along their paths with simulate_events and record
+    their moves
+
+    Input:
+        - state: a Simulation_State type object
+        - paths: a list of lists of nodes without waits
+        - assignments: the index of the path of every train
+
+    Output:
+        - a Move_Trace type object
+    """
+    trace = Move_Trace(paths[index][0] for index in assignments)
+    add_move = trace.add_move
+
+    def record(turn, trains, nodes):
+        for train, node in zip(trains, nodes):
+            add_move(train, turn, node)
+
+    simulate_events(state.network, paths, assignments, state.free_stations,
+                    record)
+    return trace
+
+
+def get_arrived_trace(state):
+    """
+    Get the trace of trains that never move, START being END
+    """
+    return Move_Trace([state.start_node] * state.amount_of_trains)
+
+
+class Strategy:
+    """
+    A way of bringing the trains from START to END. Every strategy takes
+    a Simulation_State and gives the moves of the trains.
+    """
+    name = None
+
+    def run(self, state):
+        """
+        Output:
+            - a Move_Trace type object, None if END can not be reached
+        """
+        raise NotImplementedError
+
+
+class Greedy_Strategy(Strategy):
+    """
+    Every turn each train moves to the free neighbour closest to END.
+    Trains are held at START and only released when a station next to
+    it is free: along a shortest route, or along another route when it
+    is shorter than the wait of the trains still held. Detours can crowd
+    the shortest routes, so the trains are also run without them and the
+    trace with the least turns is kept.
+    """
+    name = "greedy-bfs"
+
+    def simulate(self, state, detours):
+        """
+        Input:
+            - state: a Simulation_State type object
+            - detours: a bool type object, whether held trains may leave
+            START along another route than a shortest one
+
+        Output:
+            - a Move_Trace type object, None if the trains block each
+            other for good
+        """
+        network = state.network
+        node_station = network.node_station
+        start = state.start_node
+        start_station = node_station[start]
+        distances = state.get_end_table()
+        shortest = distances.get_distance(start)
+        # Routes that leave START without coming back through it
+        detour_distances = Distance_Table(network, state.end_node,
+                                          (start_station,))
+        # START is never entered again once left
+        occupancy = Occupancy_Map(network.station_count)
+        occupancy.occupy(start_station)
+        stations = occupancy.stations
+
+        def is_free(node):
+            return not stations[node_station[node]]
+
+        def move(train, node, next_node, turn):
+            trace.add_move(train, turn, next_node)
+            here = node_station[node]
+            there = node_station[next_node]
+            if not distances.get_distance(next_node):
+                if here != start_station:
+                    occupancy.release(here)
+                return None
+            if here != there:
+                occupancy.occupy(there)
+                if here != start_station:
+                    occupancy.release(here)
+            return next_node
+
+        trace = Move_Trace(())
+        nodes = []
+        tables = []
+        held = state.amount_of_trains
+        remaining = held
+        turn = 0
+        while remaining:
+            turn += 1
+            released = len(trace)
+            moved = False
+            # The trains closest to END move first, so that a train can
+            # follow the one ahead of it in the same turn
+            moving = sorted(
+                (tables[train].get_distance(node), train)
+                for train, node in enumerate(nodes) if node is not None
+            )
+            for _, train in moving:
+                node = nodes[train]
+                next_node = tables[train].get_next_node(node, is_free)
+                if next_node is None:
+                    continue
+                moved = True
+                nodes[train] = move(train, node, next_node, turn)
+                if nodes[train] is None:
+                    remaining -= 1
+            while held:
+                table = distances
+                next_node = distances.get_next_node(start, is_free)
+                if next_node is None and detours:
+                    # The last held train would wait at least held - 1
+                    # more turns for a shortest route
+                    table = detour_distances
+                    next_node = detour_distances.get_next_node(
+                        start, is_free, shortest + held - 1
+                    )
+                if next_node is None:
+                    break
+                held -= 1
+                tables.append(table)
+                nodes.append(move(trace.add_train(start), start, next_node,
+                                  turn))
+                if nodes[-1] is None:
+                    remaining -= 1
+            if not moved and released == len(trace):
+                # Nothing moved, every following turn would be the same
+                return None
+        return trace
+
+    def run(self, state):
+        if not state.is_reachable():
+            return None
+        elif state.is_arrived():
+            return get_arrived_trace(state)
+        traces = [trace for trace in (self.simulate(state, True),
+                                      self.simulate(state, False))
+                  if trace is not None]
+        if not traces:
+            raise Stalled_Error("%s stalled: the trains block each other" %
+                                self.name)
+        return min(traces, key=Move_Trace.get_turns)
+
+
+class Paths_Strategy(Strategy):
+    """
+    The trains are spread over station-disjoint paths planned ahead by
+    plan_routes, then run along them
+    """
+    name = "precomputed-paths"
+
+    def run(self, state):
+        if state.is_arrived():
+            return get_arrived_trace(state)
+        plan = plan_routes(state.network, state.start_node, state.end_node,
+                           state.amount_of_trains)
+        if plan is None:
+            return None
+        paths = [item[0] for item in plan.path_cost_list]
+        return replay_train_paths(state, paths, plan.get_assignments())
+
+
+class Flow_Strategy(Strategy):
+    """
+    The schedule of the maximum flow over the time expanded network,
+    given by solve_flow_schedule. It is only minimal when no two trains
+    of the flow meet at an interchange.
+    """
+    name = "flow-based"
+
+    def run(self, state):
+        result = solve_flow_schedule(
+            state.network, state.start_node, state.end_node,
+            state.amount_of_trains
+        )
+        if result is None:
+            return None
+        return Move_Trace.from_schedules(result.schedules)
+
+
+class Cooperative_Strategy(Strategy):
+    """
+    The trains are planned one after the other over space and time with
+    plan_cooperative_routes
+    """
+    name = "cooperative"
+
+    def run(self, state):
+        schedules = plan_cooperative_routes(
+            state.network, state.start_node, state.end_node,
+            state.amount_of_trains
+        )
+        if schedules is None:
+            return None
+        return Move_Trace.from_schedules(schedules)
+
+
+STRATEGIES = {
+    strategy.name: strategy
+    for strategy in (Greedy_Strategy, Paths_Strategy, Cooperative_Strategy,
+                     Flow_Strategy)
+}
+
+
+class Simulation_Engine:
+    """
+    Runs the strategies on one Simulation_State and checks that their
+    moves follow the rules
+    """
+    def __init__(self, state):
+        if not isinstance(state, Simulation_State):
+            raise TypeError("state must be a Simulation_State type object")
+        self.state = state
+
+    def run(self, strategy):
+        """
+        Input:
+            - strategy: a Strategy type object or the name of one in
+            STRATEGIES
+
+        Output:
+            - a Simulation_Result type object, None if END can not be
+            reached. Stalled_Error is raised when the trains of the
+            strategy block each other.
+        """
+        if isinstance(strategy, str):
+            try:
+                strategy = STRATEGIES[strategy]()
+            except KeyError:
+                raise ValueError("unknown strategy: %s" % strategy)
+        elif not isinstance(strategy, Strategy):
+            raise TypeError("strategy must be a Strategy type object")
+        start_time = perf_counter()
+        trace = strategy.run(self.state)
+        elapsed = perf_counter() - start_time
+        if trace is None:
+            return None
+        if len(trace) != self.state.amount_of_trains:
+            raise ValueError("%s did not schedule every train" %
+                             strategy.name)
+        if trace.find_conflicts(self.state.network.node_station,
+                                self.state.free_stations):
+            raise ValueError("%s gave colliding schedules" % strategy.name)
+        node_station = self.state.network.node_station
+        end_station = self.state.free_stations[1]
+        if any(node_station[trace.get_last_node(train)] != end_station
+               for train in range(len(trace))):
+            raise Stalled_Error("%s left trains before END" % strategy.name)
+        return Simulation_Result(strategy.name, trace, elapsed,
+                                 self.state.get_lower_bound())
+
+    def benchmark(self, strategies=None, stop_at_bound=False):
+        """
+        Run several strategies on the same state
+
+        Input:
+            - strategies: a list of strategies or names, every strategy in
+            STRATEGIES if None
+            - stop_at_bound: a bool type object, whether to skip the
+            remaining strategies once one reaches the lower bound
+
+        Output:
+            - the list of Simulation_Result type objects, the best first:
+            the least turns, then the least time. The strategies that
+            stall are left out.
+        """
+        if strategies is None:
+            strategies = list(STRATEGIES)
+        results = []
+        for strategy in strategies:
+            try:
+                result = self.run(strategy)
+            except Stalled_Error:
+                continue
+            if result is None:
+                continue
+            results.append(result)
+            if stop_at_bound and result.is_optimal():
+                break
+        results.sort(key=lambda result: (result.turns, result.elapsed))
+        return results
@@ -0,0 +1,548 @@
+#!/usr/bin/env python3
+from network import Network
+from distance import Distance_Table, UNREACHABLE
+from occupancy import Occupancy_Map
+from path_finding import find_shortest_path
+from collections import deque
+from heapq import heappush, heappop
+
+
+class Flow_Graph:
+    """
+    A directed graph with capacities and costs for the flow algorithms.
+    The edge with id e has its residual edge at e ^ 1.
+    """
+    def __init__(self, vertex_count=0):
+        if not isinstance(vertex_count, int):
+            raise TypeError("vertex_count must be an int type object")
+        self.adjacency = [[] for _ in range(vertex_count)]
+        self.heads = []
+        self.capacities = []
+        self.original_capacities = []
+        self.costs = []
+
+    def add_vertex(self):
+        self.adjacency.append([])
+        return len(self.adjacency) - 1
+
+    def add_edge(self, tail, head, capacity, cost=0):
+        """
+        Add an edge and its residual edge
+
+        Input:
+            - tail, head: int type objects represent the two vertices
+            - capacity: an int type object
+            - cost: an int type object, the cost of a unit of flow
+
+        Output:
+            - the id of the edge
+        """
+        edge = len(self.heads)
+        self.adjacency[tail].append(edge)
+        self.heads.append(head)
+        self.capacities.append(capacity)
+        self.original_capacities.append(capacity)
+        self.costs.append(cost)
+        self.adjacency[head].append(edge + 1)
+        self.heads.append(tail)
+        self.capacities.append(0)
+        self.original_capacities.append(0)
+        self.costs.append(-cost)
+        return edge
+
+    def get_flow(self, edge):
+        return self.original_capacities[edge] - self.capacities[edge]
+
+    def get_levels(self, source, sink):
+        levels = [-1] * len(self.adjacency)
+        levels[source] = 0
+        queue = deque([source])
+        while queue:
+            vertex = queue.popleft()
+            for edge in self.adjacency[vertex]:
+                head = self.heads[edge]
+                if self.capacities[edge] > 0 and levels[head] < 0:
+                    levels[head] = levels[vertex] + 1
+                    queue.append(head)
+        return levels if levels[sink] >= 0 else None
+
+    def augment(self, source, sink, levels, pointers, limit):
+        """
+        Push flow along one path of the level graph, found with an
+        iterative depth first search
+        """
+        adjacency = self.adjacency
+        heads = self.heads
+        capacities = self.capacities
+        path = []
+        vertex = source
+        while vertex != sink:
+            edges = adjacency[vertex]
+            while pointers[vertex] < len(edges):
+                edge = edges[pointers[vertex]]
+                head = heads[edge]
+                if capacities[edge] > 0 and levels[head] == levels[vertex] + 1:
+                    break
+                pointers[vertex] += 1
+            else:
+                # Dead end, never come back to it during this phase
+                if not path:
+                    return 0
+                levels[vertex] = -1
+                vertex = heads[path.pop() ^ 1]
+                pointers[vertex] += 1
+                continue
+            path.append(edge)
+            vertex = head
+        pushed = min(limit, min(capacities[edge] for edge in path))
+        for edge in path:
+            capacities[edge] -= pushed
+            capacities[edge ^ 1] += pushed
+        return pushed
+
+    def max_flow(self, source, sink, limit=None):
+        """
+        Compute a maximum flow with Dinic's algorithm
+
+        Input:
+            - source, sink: int type objects represent the two vertices
+            - limit: an int type object, the search stops as soon as that
+            much flow is found
+
+        Output:
+            - the value of the flow
+        """
+        total = 0
+        while limit is None or total < limit:
+            levels = self.get_levels(source, sink)
+            if levels is None:
+                break
+            pointers = [0] * len(self.adjacency)
+            while limit is None or total < limit:
+                pushed = self.augment(
+                    source, sink, levels, pointers,
+                    float("inf") if limit is None else limit - total
+                )
+                if not pushed:
+                    break
+                total += pushed
+        return total
+
+    def successive_shortest_paths(self, source, sink, limit=None):
+        """
+        Compute a minimum cost flow one augmenting path at a time, with
+        Dijkstra's algorithm over costs made non negative by potentials.
+        The costs of the edges must not be negative.
+
+        Input:
+            - source, sink: int type objects represent the two vertices
+            - limit: an int type object, the maximum value of the flow
+
+        Output:
+            - a generator of the (value, cost) of the flow after every
+            augmentation, the graph holding that flow when it is yielded
+        """
+        vertex_count = len(self.adjacency)
+        adjacency = self.adjacency
+        heads = self.heads
+        capacities = self.capacities
+        costs = self.costs
+        potentials = [0] * vertex_count
+        value = 0
+        total_cost = 0
+        while limit is None or value < limit:
+            distances = [None] * vertex_count
+            parents = [None] * vertex_count
+            distances[source] = 0
+            heap = [(0, source)]
+            while heap:
+                distance, vertex = heappop(heap)
+                if distance > distances[vertex]:
+                    continue
+                for edge in adjacency[vertex]:
+                    if capacities[edge] <= 0:
+                        continue
+                    head = heads[edge]
+                    next_distance = (distance + costs[edge] +
+                                     potentials[vertex] - potentials[head])
+                    if (distances[head] is None or
+                            next_distance < distances[head]):
+                        distances[head] = next_distance
+                        parents[head] = edge
+                        heappush(heap, (next_distance, head))
+            if distances[sink] is None:
+                return
+            for vertex in range(vertex_count):
+                if distances[vertex] is not None:
+                    potentials[vertex] += distances[vertex]
+            # Push as much as the path allows
+            path = []
+            vertex = sink
+            while vertex != source:
+                path.append(parents[vertex])
+                vertex = heads[parents[vertex] ^ 1]
+            pushed = min(capacities[edge] for edge in path)
+            if limit is not None:
+                pushed = min(pushed, limit - value)
+            for edge in path:
+                capacities[edge] -= pushed
+                capacities[edge ^ 1] += pushed
+                total_cost += pushed * costs[edge]
+            value += pushed
+            yield value, total_cost
+
+
+class Flow_Schedule:
+    """
+    The result of solve_flow_schedule
+
+    Attributes:
+        turns (int): the amount of turns the schedule takes
+        lower_bound (int): no schedule can take less turns than this, the
+            least turns of the flow whose nodes hold one train per turn
+        schedules (list): for every train, the list of the node it is on
+            at each turn, starting with START at turn 0
+        optimal (bool): whether turns is proven to be minimal
+    """
+    def __init__(self, turns, lower_bound, schedules):
+        self.turns = turns
+        self.lower_bound = lower_bound
+        self.schedules = schedules
+        self.optimal = turns == lower_bound
+
+    def __str__(self):
+        return "Flow_Schedule(turns=%s, lower_bound=%s, trains=%s)" % (
+            self.turns, self.lower_bound, len(self.schedules)
+        )
+
+
+def get_forward_distances(network, source):
+    """
+    Get the number of turns from a node to every node of a network
+    """
+    distances = [UNREACHABLE] * network.node_count
+    distances[source] = 0
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for next_node in network.get_neighbours(node):
+            if distances[next_node] == UNREACHABLE:
+                distances[next_node] = distances[node] + 1
+                queue.append(next_node)
+    return distances
+
+
+def build_time_expanded_graph(network, start_node, end_table, turns,
+                              amount_of_trains, start_distances,
+                              forbidden=()):
+    """
+    Build the network unrolled over a number of turns. Every node at
+    every turn can hold one train (START and END can hold all of them),
+    a train either waits or follows an edge of the network on each turn.
+    The nodes that can not be on the way from START to END within the
+    turns are left out, as well as the (node, turn) pairs in forbidden.
+
+    Output:
+        - graph: a Flow_Graph type object
+        - source, sink: the two vertices of the flow
+        - vertex_nodes: the (node, turn) pair of the vertex where each
+        train enters a node at a turn, None for the other vertices
+    """
+    node_station = network.node_station
+    start_station = node_station[start_node]
+    end_station = end_table.end_station
+    graph = Flow_Graph(2)
+    source, sink = 0, 1
+    vertex_nodes = [None, None]
+    exits = {}
+    for turn in range(turns + 1):
+        for node in range(network.node_count):
+            if (start_distances[node] > turn or
+                    end_table.distances[node] > turns - turn or
+                    (node, turn) in forbidden):
+                continue
+            station = node_station[node]
+            capacity = (amount_of_trains
+                        if station in (start_station, end_station) else 1)
+            entry = graph.add_vertex()
+            vertex_nodes.append((node, turn))
+            exit_vertex = graph.add_vertex()
+            vertex_nodes.append(None)
+            graph.add_edge(entry, exit_vertex, capacity)
+            exits[node, turn] = exit_vertex
+            if station == end_station:
+                graph.add_edge(exit_vertex, sink, amount_of_trains)
+                continue
+            if turn:
+                # Wait, ride or transfer from the previous turn
+                for previous in network.get_predecessors(node):
+                    if (previous, turn - 1) in exits and (
+                            node_station[previous] != end_station):
+                        graph.add_edge(exits[previous, turn - 1], entry, 1)
+                if (node, turn - 1) in exits:
+                    graph.add_edge(exits[node, turn - 1], entry, capacity)
+            elif node == start_node:
+                graph.add_edge(source, entry, amount_of_trains)
+    # The END station is entered from the previous turn as well
+    for turn in range(1, turns + 1):
+        for node in network.get_station_nodes(end_station):
+            if (node, turn) not in exits:
+                continue
+            entry = exits[node, turn] - 1
+            for previous in network.get_predecessors(node):
+                if (previous, turn - 1) in exits and (
+                        node_station[previous] != end_station):
+                    graph.add_edge(exits[previous, turn - 1], entry, 1)
+    return graph, source, sink, vertex_nodes
+
+
+def decompose_flow(graph, source, sink, vertex_nodes):
+    """
+    Split a flow of the time expanded graph into one schedule per train
+    """
+    schedules = []
+    used = {}
+    while True:
+        vertex = source
+        schedule = []
+        while vertex != sink:
+            for edge in graph.adjacency[vertex]:
+                if edge % 2 == 0 and graph.get_flow(edge) > used.get(edge, 0):
+                    used[edge] = used.get(edge, 0) + 1
+                    vertex = graph.heads[edge]
+                    break
+            else:
+                return schedules
+            if vertex_nodes[vertex] is not None:
+                node, turn = vertex_nodes[vertex]
+                # Fill the turns spent at END or START without a vertex
+                while schedule and len(schedule) < turn:
+                    schedule.append(schedule[-1])
+                schedule.append(node)
+        schedules.append(schedule)
+
+
+def remove_swaps(schedules, node_station):
+    """
+    Two trains that swap stations on the same turn can not pass each
+    other, make them both wait and exchange the rest of their schedules
+    instead
+    """
+    changed = True
+    while changed:
+        changed = False
+        moves = {}
+        for index, schedule in enumerate(schedules):
+            for turn in range(len(schedule) - 1):
+                here = node_station[schedule[turn]]
+                there = node_station[schedule[turn + 1]]
+                if here == there:
+                    continue
+                other = moves.get((turn, there, here))
+                if other is not None and (
+                        schedules[other][turn] == schedule[turn + 1] and
+                        schedules[other][turn + 1] == schedule[turn]):
+                    first = schedules[other]
+                    first_tail = first[turn + 1:]
+                    first[turn + 1:] = [first[turn]] + schedule[turn + 2:]
+                    schedule[turn + 1:] = [schedule[turn]] + first_tail[1:]
+                    changed = True
+                    break
+                moves[turn, here, there] = index
+            if changed:
+                break
+
+
+def find_conflicts(schedules, node_station, free_stations):
+    """
+    Find the trains that stand on a station another train already
+    stands on, or swap stations with another train, at the same turn
+
+    Output:
+        - the list of the (node, turn) pairs where the later of the two
+        trains is
+    """
+    occupied = set()
+    moves = set()
+    conflicts = []
+    for schedule in schedules:
+        for turn, node in enumerate(schedule):
+            station = node_station[node]
+            previous = node_station[schedule[turn - 1]]
+            if turn and previous != station:
+                if (turn, station, previous) in moves:
+                    conflicts.append((node, turn))
+                moves.add((turn, previous, station))
+            if station in free_stations:
+                continue
+            if (turn, station) in occupied:
+                conflicts.append((node, turn))
+            occupied.add((turn, station))
+    return conflicts
+
+
+def get_pipeline_schedules(network, start_node, end_node, amount_of_trains):
+    """
+    The fallback schedule: every train follows the same shortest path,
+    two turns apart so that transfers never block the next train
+    """
+    path = find_shortest_path(network, start_node, end_node)
+    return [
+        [start_node] * (2 * index) + path
+        for index in range(amount_of_trains)
+    ]
+
+
+def replay_paths(network, paths, free_stations):
+    """
+    Turn paths into schedules: on every turn each train, in order, moves
+    to the next node of its path unless another train stands on that
+    station. Transfers and moves into a free station always succeed.
+
+    Input:
+        - network: a Network type object
+        - paths: a list of lists of nodes without waits
+        - free_stations: the stations that can hold any amount of trains
+
+    Output:
+        - the list of schedules, in the same order as paths, None if the
+        trains stall: a whole turn passes without any of them moving,
+        as when two routes cross in opposite directions
+    """
+    node_station = network.node_station
+    schedules = [[path[0]] for path in paths]
+    positions = [0] * len(paths)
+    occupancy = Occupancy_Map(network.station_count)
+    remaining = sum(len(path) > 1 for path in paths)
+    while remaining:
+        moved = False
+        for index, path in enumerate(paths):
+            position = positions[index]
+            schedule = schedules[index]
+            if position == len(path) - 1:
+                continue
+            here = node_station[path[position]]
+            there = node_station[path[position + 1]]
+            if (here == there or there in free_stations or
+                    occupancy.is_free(there)):
+                occupancy.release(here)
+                if there not in free_stations:
+                    occupancy.occupy(there)
+                positions[index] = position + 1
+                moved = True
+                if position + 2 == len(path):
+                    remaining -= 1
+            schedule.append(path[positions[index]])
+        if not moved:
+            return None
+    # Trains that already arrived stay at END
+    turns = max(len(schedule) for schedule in schedules)
+    for schedule in schedules:
+        schedule.extend([schedule[-1]] * (turns - len(schedule)))
+    return [schedule[:schedule.index(schedule[-1]) + 1]
+            for schedule in schedules]
+
+
+def solve_flow_schedule(network, start_node, end_node, amount_of_trains,
+                        max_retries=8, max_rounds=10):
+    """
+    Schedule the trains from START to END with maximum flows of the time
+    expanded network, searching for the smallest number of turns T for
+    which the flow reaches the amount of trains.
+
+    Every node of the time expanded network holds one train per turn,
+    but the capacity of a station is not modelled: two trains on
+    different lines of an interchange are allowed at the same turn
+    there. The T found is therefore only a lower bound, and the schedule
+    is minimal only when its decomposition has no such collision, which
+    Flow_Schedule.optimal tells. Otherwise the colliding (node, turn)
+    pairs are removed from the time expanded network and the flow is
+    computed again, then the next values of T are tried. If none works,
+    the routes of the first flow are replayed with trains waiting for
+    each other, or every train follows a single shortest path, whichever
+    finishes first. The result can then take more turns than the other
+    strategies.
+
+    Input:
+        - network: a Network type object
+        - start_node, end_node: int type objects represent START and END
+        - amount_of_trains: an int type object
+        - max_retries: an int type object, the amount of larger T tried
+        when the decomposition collides
+        - max_rounds: an int type object, the amount of times collisions
+        are removed for each T
+
+    Output:
+        - a Flow_Schedule type object, None if END can not be reached
+    """
+    if not isinstance(network, Network):
+        raise TypeError("network must be a Network type object")
+    elif not isinstance(amount_of_trains, int):
+        raise TypeError("amount_of_trains must be an int type object")
+    end_table = Distance_Table(network, end_node)
+    shortest = end_table.distances[start_node]
+    if shortest == UNREACHABLE:
+        return None
+    if not amount_of_trains:
+        return Flow_Schedule(0, 0, [])
+    start_distances = get_forward_distances(network, start_node)
+    node_station = network.node_station
+    free_stations = (node_station[start_node], end_table.end_station)
+
+    def get_flow(turns, forbidden=()):
+        graph, source, sink, vertex_nodes = build_time_expanded_graph(
+            network, start_node, end_table, turns, amount_of_trains,
+            start_distances, forbidden
+        )
+        value = graph.max_flow(source, sink, amount_of_trains)
+        return value, graph, source, sink, vertex_nodes
+
+    # Binary search between the shortest path and a single pipeline
+    low = shortest
+    high = shortest + 2 * (amount_of_trains - 1)
+    while low < high:
+        middle = (low + high) // 2
+        if get_flow(middle)[0] >= amount_of_trains:
+            high = middle
+        else:
+            low = middle + 1
+    lower_bound = low
+    fallback = None
+    replayed = False
+    for turns in range(lower_bound, min(lower_bound + max_retries, high) + 1):
+        forbidden = set()
+        for _ in range(max_rounds):
+            value, graph, source, sink, vertex_nodes = get_flow(
+                turns, forbidden
+            )
+            if value < amount_of_trains:
+                break
+            schedules = decompose_flow(graph, source, sink, vertex_nodes)
+            remove_swaps(schedules, node_station)
+            conflicts = find_conflicts(schedules, node_station, free_stations)
+            if not conflicts:
+                return Flow_Schedule(turns, lower_bound, schedules)
+            if not replayed:
+                replayed = True
+                # Keep the routes of the first flow, in their order of
+                # departure, to be replayed if no exact schedule is found
+                schedules.sort(key=lambda schedule: schedule.count(start_node))
+                fallback = replay_paths(
+                    network,
+                    [[node for turn, node in enumerate(schedule)
+                      if not turn or node != schedule[turn - 1]]
+                     for schedule in schedules],
+                    free_stations
+                )
+            forbidden.update(conflicts)
+    schedules = get_pipeline_schedules(
+        network, start_node, end_node, amount_of_trains
+    )
+    if fallback is not None and (
+            max(map(len, fallback)) < max(map(len, schedules))):
+        schedules = fallback
+    return Flow_Schedule(
+        max(len(schedule) - 1 for schedule in schedules),
+        lower_bound,
+        schedules
+    )
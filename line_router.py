@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+from base_graph import Base_Map
+from bisect import bisect_left
+from heapq import heappush, heappop
+
+# The turns a transfer between two lines takes
+TRANSFER_COST = 1
+
+
+class Line_Router:
+    """
+    A two-level router. The upper level is a small graph whose vertices
+    are the interchanges of every line, found from the crossing_lines of
+    the lines, linked to the next interchange along the line and to the
+    other lines at the same station. The lower level gives the turns
+    between two indexes of a line by arithmetic, going around circular
+    lines either way, so the stations between interchanges are never
+    visited.
+
+    The turns are the same as the ones of the compiled Network: one per
+    ride between neighbouring stations and TRANSFER_COST per transfer.
+    """
+    def __init__(self, base_map):
+        if not isinstance(base_map, Base_Map):
+            raise TypeError("base_map must be a Base_Map type object")
+        self.base_map = base_map
+        lines = base_map.get_all_lines()
+        self.line_names = [line.name for line in lines]
+        # The amount of distinct positions of every line, the first and
+        # last positions of a circular line being the same station
+        self.lengths = [
+            len(line.stations) - 1 if line.circular else len(line.stations)
+            for line in lines
+        ]
+        self.circular = [line.circular for line in lines]
+        interchanges = [set() for _ in lines]
+        for line_id, line in enumerate(lines):
+            for other_name, stations in line.crossing_lines.items():
+                other_id = base_map.get_line_id(other_name)
+                for station in stations:
+                    interchanges[line_id].add(station.name)
+                    interchanges[other_id].add(station.name)
+        # Vertex v is the interchange at keys[line][k] of its line
+        self.keys = []
+        self.vertex_offsets = [0]
+        self.vertex_lines = []
+        self.vertex_positions = []
+        vertex_ids = {}
+        for line_id, line in enumerate(lines):
+            positions = sorted(
+                self.get_position(line_id, base_map.get_station_by_name(
+                    name).get_index_on_line(line.name))
+                for name in interchanges[line_id]
+            )
+            self.keys.append(positions)
+            for position in positions:
+                vertex_ids[line_id, lines[line_id].stations[position].name] = (
+                    len(self.vertex_lines)
+                )
+                self.vertex_lines.append(line_id)
+                self.vertex_positions.append(position)
+            self.vertex_offsets.append(len(self.vertex_lines))
+        self.adjacency = [[] for _ in self.vertex_lines]
+        for line_id, positions in enumerate(self.keys):
+            first = self.vertex_offsets[line_id]
+            count = len(positions)
+            # Rides to the next interchange, the last one going back to
+            # the first on a circular line
+            if self.circular[line_id] and count > 1:
+                pairs = count
+            else:
+                pairs = count - 1
+            for index in range(max(0, pairs)):
+                next_index = (index + 1) % count
+                cost = self.get_line_distance(
+                    line_id, positions[index], positions[next_index]
+                )
+                vertex = first + index
+                next_vertex = first + next_index
+                self.adjacency[vertex].append((next_vertex, cost))
+                self.adjacency[next_vertex].append((vertex, cost))
+        for (line_id, name), vertex in vertex_ids.items():
+            for other_line in base_map.get_station_by_name(
+                    name).get_conn_lines():
+                other_id = base_map.get_line_id(other_line.name)
+                if other_id != line_id:
+                    self.adjacency[vertex].append(
+                        (vertex_ids[other_id, name], TRANSFER_COST)
+                    )
+
+    def get_position(self, line_id, index):
+        if self.circular[line_id]:
+            return index % self.lengths[line_id]
+        return index
+
+    def get_line_distance(self, line_id, index1, index2):
+        """
+        Get the turns between two indexes of a line
+        """
+        distance = abs(self.get_position(line_id, index1) -
+                       self.get_position(line_id, index2))
+        if self.circular[line_id]:
+            distance = min(distance, self.lengths[line_id] - distance)
+        return distance
+
+    def get_key_neighbours(self, line_id, index):
+        """
+        Get the interchanges on either side of an index of a line, with
+        the turns to each
+
+        Output:
+            - a list of (vertex, turns) pairs
+        """
+        positions = self.keys[line_id]
+        if not positions:
+            return []
+        position = self.get_position(line_id, index)
+        found = bisect_left(positions, position)
+        candidates = set()
+        if found < len(positions):
+            candidates.add(found)
+            if positions[found] == position:
+                return [(self.vertex_offsets[line_id] + found, 0)]
+        if found > 0:
+            candidates.add(found - 1)
+        if self.circular[line_id]:
+            candidates.add(found % len(positions))
+            candidates.add((found - 1) % len(positions))
+        return [
+            (self.vertex_offsets[line_id] + key,
+             self.get_line_distance(line_id, position, positions[key]))
+            for key in candidates
+        ]
+
+    def find_distance(self, line_name, index, station_name):
+        """
+        Find the least turns from an index of a line to a station, which
+        is reached on any of its lines
+
+        Input:
+            - line_name: a str type object represents the name of the line
+            - index: an int type object represents the index of the
+            station on that line
+            - station_name: a str type object represents the station to
+            reach
+
+        Output:
+            - the turns, None if the station can not be reached
+        """
+        line_id = self.base_map.get_line_id(line_name)
+        if line_id is None:
+            raise ValueError("Line doesn't exist")
+        elif not 0 <= index < len(self.base_map.lines[line_id].stations):
+            raise ValueError("index is out of the line")
+        station = self.base_map.get_station_by_name(station_name)
+        if station is None:
+            raise ValueError("Station doesn't exist")
+        best = None
+        # The turns from each interchange to the station along its lines
+        remaining = {}
+        for end_line in station.get_conn_lines():
+            end_id = self.base_map.get_line_id(end_line.name)
+            end_index = station.get_index_on_line(end_line.name)
+            if end_id == line_id:
+                best = self.get_line_distance(line_id, index, end_index)
+            for vertex, turns in self.get_key_neighbours(end_id, end_index):
+                if turns < remaining.get(vertex, turns + 1):
+                    remaining[vertex] = turns
+        distances = {}
+        heap = []
+        for vertex, turns in self.get_key_neighbours(line_id, index):
+            if turns < distances.get(vertex, turns + 1):
+                distances[vertex] = turns
+                heappush(heap, (turns, vertex))
+        while heap:
+            turns, vertex = heappop(heap)
+            if best is not None and turns >= best:
+                break
+            if turns > distances[vertex]:
+                continue
+            if vertex in remaining and (
+                    best is None or turns + remaining[vertex] < best):
+                best = turns + remaining[vertex]
+            for next_vertex, cost in self.adjacency[vertex]:
+                next_turns = turns + cost
+                if next_turns < distances.get(next_vertex, next_turns + 1):
+                    distances[next_vertex] = next_turns
+                    heappush(heap, (next_turns, next_vertex))
+        return best
+
+    def __len__(self):
+        return len(self.vertex_lines)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+from base_graph import Base_Map
+from network import Network
+from distance import Distance_Table
+from time import perf_counter
+
+
+class Live_Distances:
+    """
+    Distance tables kept in step with the closed stations and suspended
+    lines of a Base_Map: every change is repaired in place around the
+    nodes it affects instead of computing the tables again
+
+    Attributes:
+        tables (dict): the Distance_Table to each END station id
+        last_repair (tuple): the amount of nodes recomputed and the
+            seconds taken by the last change
+    """
+    def __init__(self, base_map, network):
+        """
+        Input:
+            - base_map: a Base_Map type object
+            - network: a Network type object compiled from base_map
+        """
+        if not isinstance(base_map, Base_Map):
+            raise TypeError("base_map must be a Base_Map type object")
+        elif not isinstance(network, Network):
+            raise TypeError("network must be a Network type object")
+        self.base_map = base_map
+        self.network = network
+        self.tables = {}
+        self.last_repair = (0, 0.0)
+        base_map.add_listener(self.update)
+
+    def get_table(self, end_node):
+        """
+        Get the table to the station of a node, built with the current
+        changes of the map the first time
+        """
+        end_station = self.network.node_station[end_node]
+        try:
+            return self.tables[end_station]
+        except KeyError:
+            pass
+        table = Distance_Table(
+            self.network, end_node,
+            [self.network.station_ids[name]
+             for name in self.base_map.closed_stations],
+            [self.network.line_ids[name]
+             for name in self.base_map.suspended_lines]
+        )
+        self.tables[end_station] = table
+        return table
+
+    def update(self, event, name):
+        """
+        Repair every table after a change of the map, called by the
+        Base_Map
+        """
+        start_time = perf_counter()
+        repaired = 0
+        for table in self.tables.values():
+            if event == "close_station":
+                repaired += table.block_station(self.network.station_ids[name])
+            elif event == "reopen_station":
+                table.unblock_station(self.network.station_ids[name])
+            elif event == "suspend_line":
+                repaired += table.block_line(self.network.line_ids[name])
+            elif event == "resume_line":
+                table.unblock_line(self.network.line_ids[name])
+        self.last_repair = (repaired, perf_counter() - start_time)
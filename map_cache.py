@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+from base_graph import Base_Map, Station, Station_Line
+from array import array
+from hashlib import sha256
+import struct
+
+MAGIC = b"MRC\x01"
+CACHE_EXTENSION = ".mrc"
+HEADER = struct.Struct("<4s32sII")
+LOCATION = struct.Struct("<iiiiI")
+
+
+def get_cache_name(file_name):
+    """
+    Get the name of the compiled cache that belongs to a map file
+
+    Input:
+        - file_name: a str type object represents the name of the map file
+
+    Output:
+        - the name of the cache file, placed next to the map file
+    """
+    if not isinstance(file_name, str):
+        raise TypeError("file_name must be a str type object")
+    return file_name + CACHE_EXTENSION
+
+
+def hash_file(file_name):
+    """
+    Hash the content of a file, used as the key of its compiled cache
+
+    Input:
+        - file_name: a str type object represents the name of the file
+
+    Output:
+        - the sha256 digest of the file as a bytes type object
+    """
+    if not isinstance(file_name, str):
+        raise TypeError("file_name must be a str type object")
+    digest = sha256()
+    with open(file_name, "rb") as input_file:
+        for chunk in iter(lambda: input_file.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def write_string(output_file, string):
+    encoded = string.encode("utf-8")
+    output_file.write(struct.pack("<I", len(encoded)))
+    output_file.write(encoded)
+
+
+def read_string(input_file):
+    length, = struct.unpack("<I", input_file.read(4))
+    return input_file.read(length).decode("utf-8")
+
+
+def write_array(output_file, items):
+    output_file.write(struct.pack("<I", len(items)))
+    items.tofile(output_file)
+
+
+def read_array(input_file):
+    length, = struct.unpack("<I", input_file.read(4))
+    items = array("i")
+    items.fromfile(input_file, length)
+    return items
+
+
+def compile_map(cache_name, digest, base_map, start_info, end_info,
+                amount_of_trains):
+    """
+    Write a compact binary form of a parsed map: the station and line
+    names, the station ids of every line, the interchange table and
+    the START/END/TRAINS designation.
+
+    Input:
+        - cache_name: a str type object represents the name of the cache
+        - digest: a bytes type object represents the hash of the map file
+        - base_map: a Base_Map type object represents the whole map
+        - start_info: a tuple of the line name and index of START
+        - end_info: a tuple of the line name and index of END
+        - amount_of_trains: an int type object represents TRAINS
+    """
+    if not isinstance(cache_name, str):
+        raise TypeError("cache_name must be a str type object")
+    elif not isinstance(digest, bytes):
+        raise TypeError("digest must be a bytes type object")
+    elif not isinstance(base_map, Base_Map):
+        raise TypeError("base_map must be a Base_Map type object")
+    station_ids = {}
+    line_ids = {}
+    line_arrays = []
+    for line in base_map.get_all_lines():
+        line_ids[line.name] = len(line_ids)
+        line_array = array("i")
+        for station in line.get_stations():
+            try:
+                line_array.append(station_ids[station.name])
+            except KeyError:
+                station_ids[station.name] = len(station_ids)
+                line_array.append(station_ids[station.name])
+        line_arrays.append(line_array)
+    # Every (station id, line id) pair of the stations on several lines
+    interchanges = array("i")
+    for line in base_map.get_all_lines():
+        for line_name, stations in line.crossing_lines.items():
+            for station in stations:
+                interchanges.extend((station_ids[station.name],
+                                     line_ids[line.name],
+                                     station_ids[station.name],
+                                     line_ids[line_name]))
+    with open(cache_name, "wb") as output_file:
+        output_file.write(HEADER.pack(
+            MAGIC, digest, len(station_ids), len(line_ids)
+        ))
+        for station_name in station_ids:
+            write_string(output_file, station_name)
+        for line, line_array in zip(base_map.get_all_lines(), line_arrays):
+            write_string(output_file, line.name)
+            output_file.write(struct.pack("<?", line.circular))
+            write_array(output_file, line_array)
+        write_array(output_file, interchanges)
+        output_file.write(LOCATION.pack(
+            line_ids[start_info[0]], start_info[1],
+            line_ids[end_info[0]], end_info[1],
+            amount_of_trains
+        ))
+
+
+def load_compiled_map(cache_name, digest):
+    """
+    Rebuild a map from its compiled cache without parsing the map file
+
+    Input:
+        - cache_name: a str type object represents the name of the cache
+        - digest: a bytes type object represents the hash of the map file
+        the cache has to match
+
+    Output:
+        - base_map, start_info, end_info, amount_of_trains like read_input,
+        None if the cache is missing, stale or damaged
+    """
+    if not isinstance(cache_name, str):
+        raise TypeError("cache_name must be a str type object")
+    elif not isinstance(digest, bytes):
+        raise TypeError("digest must be a bytes type object")
+    try:
+        with open(cache_name, "rb") as input_file:
+            magic, cached_digest, station_count, line_count = HEADER.unpack(
+                input_file.read(HEADER.size)
+            )
+            if magic != MAGIC or cached_digest != digest:
+                return None
+            stations = [
+                Station(read_string(input_file))
+                for _ in range(station_count)
+            ]
+            base_map = Base_Map()
+            for _ in range(line_count):
+                new_line = Station_Line(read_string(input_file))
+                new_line.circular, = struct.unpack("<?", input_file.read(1))
+                for station_id in read_array(input_file):
+                    new_line.add_station(stations[station_id])
+                base_map.add_line(new_line)
+            for station_id in read_array(input_file)[::2]:
+                stations[station_id].is_intersection = True
+            (start_line, start_index, end_line, end_index,
+             amount_of_trains) = LOCATION.unpack(
+                input_file.read(LOCATION.size)
+            )
+        # A damaged designation could point anywhere, negative ids too
+        if not (0 <= start_line < line_count and 0 <= end_line < line_count):
+            return None
+        lines = base_map.get_all_lines()
+        start_info = (lines[start_line].name, start_index)
+        end_info = (lines[end_line].name, end_index)
+        base_map.update_start_end_station(*start_info)
+        base_map.update_start_end_station(*end_info, True)
+    except (OSError, EOFError, struct.error, UnicodeDecodeError,
+            IndexError, ValueError):
+        return None
+    return base_map, start_info, end_info, amount_of_trains
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+from array import array
+from heapq import heapify, heapreplace, heappop
+
+
+class Move_Trace:
+    """
+    The moves of every train, kept as flat (turn, node) pairs in one
+    array('i') per train, starting with (0, START). Turns in which a
+    train waits are not stored.
+
+    Attributes:
+        moves (list): the array of the (turn, node) pairs of every train
+    """
+    def __init__(self, start_nodes):
+        """
+        Input:
+            - start_nodes: the node of every train at turn 0
+        """
+        self.moves = [array("i", (0, node)) for node in start_nodes]
+
+    @classmethod
+    def from_schedules(cls, schedules):
+        """
+        Input:
+            - schedules: for every train, the list of the node it is on at
+            each turn
+        """
+        trace = cls(schedule[0] for schedule in schedules)
+        for moves, schedule in zip(trace.moves, schedules):
+            for turn in range(1, len(schedule)):
+                if schedule[turn] != schedule[turn - 1]:
+                    moves.append(turn)
+                    moves.append(schedule[turn])
+        return trace
+
+    def add_train(self, start_node):
+        """
+        Add a train standing on a node at turn 0
+
+        Output:
+            - the index of the train
+        """
+        self.moves.append(array("i", (0, start_node)))
+        return len(self.moves) - 1
+
+    def add_move(self, train, turn, node):
+        moves = self.moves[train]
+        moves.append(turn)
+        moves.append(node)
+
+    def get_arrival(self, train):
+        """
+        Get the turn of the last move of a train
+        """
+        return self.moves[train][-2]
+
+    def get_last_node(self, train):
+        """
+        Get the node a train stands on after its last move
+        """
+        return self.moves[train][-1]
+
+    def get_turns(self):
+        """
+        Get the amount of turns until every train arrived
+        """
+        return max((moves[-2] for moves in self.moves), default=0)
+
+    def get_schedule(self, train):
+        """
+        Get the node of a train at each turn until its last move
+        """
+        moves = self.moves[train]
+        schedule = [moves[1]]
+        for index in range(2, len(moves), 2):
+            schedule.extend([schedule[-1]] * (moves[index] - len(schedule)))
+            schedule.append(moves[index + 1])
+        return schedule
+
+    def iter_turns(self):
+        """
+        Go through the moves turn by turn, with a cursor in the moves of
+        every train and a heap of the trains by the turn of their next
+        move
+
+        Output:
+            - a generator of (turn, trains, nodes), the trains that move
+            at the turn, in order, and the nodes they move to
+        """
+        cursors = [2] * len(self.moves)
+        heap = [(moves[2], train) for train, moves in enumerate(self.moves)
+                if len(moves) > 2]
+        heapify(heap)
+        while heap:
+            turn = heap[0][0]
+            trains = []
+            nodes = []
+            while heap and heap[0][0] == turn:
+                train = heap[0][1]
+                moves = self.moves[train]
+                cursor = cursors[train]
+                trains.append(train)
+                nodes.append(moves[cursor + 1])
+                cursor += 2
+                cursors[train] = cursor
+                if cursor < len(moves):
+                    heapreplace(heap, (moves[cursor], train))
+                else:
+                    heappop(heap)
+            yield turn, trains, nodes
+
+    def find_conflicts(self, node_station, free_stations):
+        """
+        Find the trains that move to a station another train stands on,
+        or swap stations with another train, at the same turn
+
+        Output:
+            - the list of the (node, turn) pairs where the later of the two
+            trains is
+        """
+        positions = [moves[1] for moves in self.moves]
+        counts = {}
+        for node in positions:
+            station_id = node_station[node]
+            counts[station_id] = counts.get(station_id, 0) + 1
+        conflicts = []
+        for turn, trains, nodes in self.iter_turns():
+            moved = set()
+            for train, node in zip(trains, nodes):
+                here = node_station[positions[train]]
+                there = node_station[node]
+                positions[train] = node
+                if here == there:
+                    continue
+                if (there, here) in moved:
+                    conflicts.append((node, turn))
+                moved.add((here, there))
+                counts[here] -= 1
+                counts[there] = counts.get(there, 0) + 1
+            for node in nodes:
+                station_id = node_station[node]
+                if station_id not in free_stations and counts[station_id] > 1:
+                    conflicts.append((node, turn))
+        return conflicts
+
+    def __len__(self):
+        return len(self.moves)
+
+    def __str__(self):
+        return "Move_Trace(trains=%s, moves=%s, turns=%s)" % (
+            len(self.moves),
+            sum(len(moves) // 2 - 1 for moves in self.moves),
+            self.get_turns()
+        )
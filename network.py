@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+from base_graph import Base_Map
+from array import array
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Kinds of edges
+RIDE = 0
+TRANSFER = 1
+
+
+class Network:
+    """
+    An immutable, array-backed form of a Base_Map for the solvers.
+
+    Every (line, index) pair of the map is a node with an integer id,
+    the nodes of a line being consecutive. The edges going out of node n
+    are targets[offsets[n]:offsets[n + 1]] (compressed sparse rows),
+    with the kind of each edge (RIDE along the line or TRANSFER to
+    another line at the same station) at the same position in kinds.
+    """
+    def __init__(self, line_names, line_offsets, station_names,
+                 node_station, offsets, targets, kinds):
+        self.line_names = tuple(line_names)
+        self.line_offsets = line_offsets
+        self.station_names = tuple(station_names)
+        self.node_station = node_station
+        self.offsets = offsets
+        self.targets = targets
+        self.kinds = kinds
+        self.node_count = len(node_station)
+        self.station_count = len(self.station_names)
+        self.line_ids = {name: index for index, name in enumerate(line_names)}
+        self.station_ids = {
+            name: index for index, name in enumerate(station_names)
+        }
+        # Line id of every node
+        self.node_line = array("i", bytes(4 * self.node_count))
+        for line_id in range(len(self.line_names)):
+            for node in range(line_offsets[line_id],
+                              line_offsets[line_id + 1]):
+                self.node_line[node] = line_id
+        # Nodes of every station, grouped the same way as the edges
+        self.station_offsets = array("i", bytes(4 * (self.station_count + 1)))
+        for station_id in node_station:
+            self.station_offsets[station_id + 1] += 1
+        for station_id in range(self.station_count):
+            self.station_offsets[station_id + 1] += (
+                self.station_offsets[station_id]
+            )
+        self.station_nodes = array("i", bytes(4 * self.node_count))
+        filled = array("i", self.station_offsets[:-1])
+        for node, station_id in enumerate(node_station):
+            self.station_nodes[filled[station_id]] = node
+            filled[station_id] += 1
+        # Edges reversed, rides on a circular line are not symmetric
+        self.reverse_offsets = array("i", bytes(4 * (self.node_count + 1)))
+        for target in targets:
+            self.reverse_offsets[target + 1] += 1
+        for node in range(self.node_count):
+            self.reverse_offsets[node + 1] += self.reverse_offsets[node]
+        self.reverse_sources = array("i", bytes(4 * len(targets)))
+        filled = array("i", self.reverse_offsets[:-1])
+        for node in range(self.node_count):
+            for edge in range(offsets[node], offsets[node + 1]):
+                self.reverse_sources[filled[targets[edge]]] = node
+                filled[targets[edge]] += 1
+
+    def get_node(self, line_name, index):
+        """
+        Get the id of the node at a certain index of a line
+
+        Input:
+            - line_name: a str type object represents the name of the line
+            - index: an int type object represents the index of the station
+
+        Output:
+            - the id of the node, None if the line or the index doesn't exist
+        """
+        if not isinstance(line_name, str):
+            raise TypeError("line_name must be a str type object")
+        elif not isinstance(index, int):
+            raise TypeError("index must be an int type object")
+        try:
+            line_id = self.line_ids[line_name]
+        except KeyError:
+            return None
+        node = self.line_offsets[line_id] + index
+        if 0 <= index and node < self.line_offsets[line_id + 1]:
+            return node
+        return None
+
+    def get_location(self, node):
+        """
+        Get the (line name, index) pair of a node, the form used by
+        read_input
+        """
+        line_id = self.node_line[node]
+        return self.line_names[line_id], node - self.line_offsets[line_id]
+
+    def get_station_name(self, node):
+        return self.station_names[self.node_station[node]]
+
+    def get_neighbours(self, node):
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def get_predecessors(self, node):
+        return self.reverse_sources[
+            self.reverse_offsets[node]:self.reverse_offsets[node + 1]
+        ]
+
+    def get_edges(self, node):
+        """
+        Iterate over the (target node, kind) pairs of the edges going out
+        of a node
+        """
+        for edge in range(self.offsets[node], self.offsets[node + 1]):
+            yield self.targets[edge], self.kinds[edge]
+
+    def get_station_nodes(self, station_id):
+        """
+        Get the nodes of a station, one for each line going through it
+        (two for the first station of a circular line)
+        """
+        return self.station_nodes[
+            self.station_offsets[station_id]:
+            self.station_offsets[station_id + 1]
+        ]
+
+    def as_numpy(self):
+        """
+        Get read-only NumPy views over the arrays of the network,
+        without copying them
+
+        Output:
+            - a dict from the name of every array to its view
+        """
+        if numpy is None:
+            raise ImportError("numpy is required for as_numpy")
+        views = {}
+        for name in ("offsets", "targets", "kinds", "node_station",
+                     "node_line", "line_offsets", "station_offsets",
+                     "station_nodes", "reverse_offsets", "reverse_sources"):
+            items = getattr(self, name)
+            view = numpy.frombuffer(items, dtype=numpy.dtype(items.typecode))
+            view.flags.writeable = False
+            views[name] = view
+        return views
+
+    def __len__(self):
+        return self.node_count
+
+    def __str__(self):
+        return "Network(%s nodes, %s edges, %s stations, %s lines)" % (
+            self.node_count,
+            len(self.targets),
+            self.station_count,
+            len(self.line_names)
+        )
+
+
+def compile_network(base_map):
+    """
+    Compile a Base_Map into a Network
+
+    Input:
+        - base_map: a Base_Map type object represents the whole map
+
+    Output:
+        - a Network type object
+    """
+    if not isinstance(base_map, Base_Map):
+        raise TypeError("base_map must be a Base_Map type object")
+    lines = base_map.get_all_lines()
+    line_offsets = array("i", [0])
+    for line in lines:
+        line_offsets.append(line_offsets[-1] + len(line.get_stations()))
+    station_ids = {}
+    node_station = array("i")
+    for line in lines:
+        for station in line.get_stations():
+            node_station.append(
+                station_ids.setdefault(station.name, len(station_ids))
+            )
+    offsets = array("i", [0])
+    targets = array("i")
+    kinds = array("b")
+    for line_id, line in enumerate(lines):
+        stations = line.get_stations()
+        last_index = len(stations) - 1
+        first_node = line_offsets[line_id]
+        for index, station in enumerate(stations):
+            # Ride to the previous and next station, wrapping around
+            # on a circular line
+            if index > 0:
+                targets.append(first_node + index - 1)
+                kinds.append(RIDE)
+            elif line.circular:
+                targets.append(first_node + last_index - 1)
+                kinds.append(RIDE)
+            if index < last_index:
+                targets.append(first_node + index + 1)
+                kinds.append(RIDE)
+            elif line.circular:
+                targets.append(first_node + 1)
+                kinds.append(RIDE)
+            # Transfer to the other lines going through the station
+            for other_line in station.get_conn_lines():
+                if other_line is line:
+                    continue
+                other_id = base_map.get_line_id(other_line.name)
+                targets.append(
+                    line_offsets[other_id] +
+                    station.get_index_on_line(other_line.name)
+                )
+                kinds.append(TRANSFER)
+            offsets.append(len(targets))
+    return Network(
+        [line.name for line in lines],
+        line_offsets,
+        list(station_ids),
+        node_station,
+        offsets,
+        targets,
+        kinds
+    )
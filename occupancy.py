@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+
+class Occupancy_Map:
+    """
+    Whether each station has a train on it, one byte per station id, so
+    that a test is an index
+
+    Attributes:
+        stations (bytearray): 1 for the stations with a train on them
+    """
+    def __init__(self, station_count):
+        if not isinstance(station_count, int):
+            raise TypeError("station_count must be an int type object")
+        self.stations = bytearray(station_count)
+
+    def is_free(self, station_id):
+        return not self.stations[station_id]
+
+    def occupy(self, station_id):
+        self.stations[station_id] = 1
+
+    def release(self, station_id):
+        self.stations[station_id] = 0
+
+    def clear(self):
+        self.stations[:] = bytes(len(self.stations))
+
+    def __len__(self):
+        return self.stations.count(1)
+
+    def __str__(self):
+        return "Occupancy_Map(stations=%s, occupied=%s)" % (
+            len(self.stations), len(self)
+        )
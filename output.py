@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+from network import Network
+from sys import stdout
+
+FULL = "full"
+SUMMARY = "summary"
+QUIET = "quiet"
+MODES = (FULL, SUMMARY, QUIET)
+
+
+class Turn_Writer:
+    """
+    Writes the runs through one buffer. In FULL mode every turn is
+    written with the stations that have trains on them and the amount
+    of trains at END, in SUMMARY mode only the results, and in QUIET
+    mode only the amount of turns.
+
+    The text of every station is kept between turns and only formatted
+    again when the trains on it change.
+    """
+    def __init__(self, network, end_station, mode=FULL, stream=None,
+                 buffer_size=1 << 16):
+        """
+        Input:
+            - network: a Network type object
+            - end_station: an int type object, the station id of END
+            - mode: one of MODES
+            - stream: the file written to, sys.stdout if None
+            - buffer_size: an int type object, the amount of characters
+            kept before they are written
+        """
+        if not isinstance(network, Network):
+            raise TypeError("network must be a Network type object")
+        elif mode not in MODES:
+            raise ValueError("mode must be one of %s" % ", ".join(MODES))
+        self.network = network
+        self.end_station = end_station
+        self.mode = mode
+        self.stream = stdout if stream is None else stream
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.buffered = 0
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.buffered += len(text)
+        if self.buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.stream.write("".join(self.buffer))
+            self.buffer = []
+            self.buffered = 0
+        self.stream.flush()
+
+    def format_station(self, station_id, trains, positions):
+        """
+        Format a station and the trains on it, the line and index being
+        the ones of the first train
+        """
+        line_name, index = self.network.get_location(positions[trains[0]])
+        return "%s(%s:%s)-%s|" % (
+            self.network.station_names[station_id], line_name, index + 1,
+            "".join("T%s" % train for train in trains)
+        )
+
+    def write_trace(self, trace):
+        """
+        Write every turn of a Move_Trace type object, in FULL mode only
+        """
+        if self.mode != FULL:
+            return
+        node_station = self.network.node_station
+        positions = [moves[1] for moves in trace.moves]
+        station_trains = {}
+        for train, node in enumerate(positions):
+            station_trains.setdefault(node_station[node], set()).add(train)
+        texts = [""] * self.network.station_count
+        changed = set(station_trains)
+        turn_text = ""
+        last_turn = 0
+        for turn, trains, nodes in trace.iter_turns():
+            # Nothing moved in the turns skipped by the trace
+            for _ in range(last_turn + 1, turn):
+                self.write(turn_text)
+            last_turn = turn
+            for train, node in zip(trains, nodes):
+                here = node_station[positions[train]]
+                there = node_station[node]
+                positions[train] = node
+                if here != there:
+                    station_trains[here].discard(train)
+                    station_trains.setdefault(there, set()).add(train)
+                    changed.add(here)
+                changed.add(there)
+            for station_id in changed:
+                on_station = station_trains.get(station_id)
+                texts[station_id] = self.format_station(
+                    station_id, sorted(on_station), positions
+                ) if on_station else ""
+            changed.clear()
+            turn_text = "%s\n%s\n\n" % (
+                "".join(texts),
+                len(station_trains.get(self.end_station, ()))
+            )
+            self.write(turn_text)
+
+    def write_results(self, results):
+        """
+        Write the results of the strategies that were compared, in FULL
+        and SUMMARY modes
+        """
+        if self.mode != QUIET:
+            for result in results:
+                self.write("%s\n" % result)
+
+    def write_cost(self, turns):
+        self.write("cost: %s\n" % turns)
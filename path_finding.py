@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+from network import Network
+from collections import deque
+
+
+def find_shortest_path(network, source, target, blocked=None):
+    """
+    Find a shortest path between two nodes with a breadth first search.
+    The visited nodes and the parent pointers are local to the call and
+    the network is never written, so any amount of searches can run at
+    once over the same network.
+
+    Input:
+        - network: a Network type object
+        - source: an int type object represents the node the path starts at
+        - target: an int type object represents the node to reach, every
+        node of the same station counts as reached
+        - blocked: a sequence indexed by station id, the stations whose
+        item is true can not be entered
+
+    Output:
+        - the list of nodes from source to the reached node, None if no
+        path exists
+    """
+    if not isinstance(network, Network):
+        raise TypeError("network must be a Network type object")
+    elif not isinstance(source, int):
+        raise TypeError("source must be an int type object")
+    elif not isinstance(target, int):
+        raise TypeError("target must be an int type object")
+    node_station = network.node_station
+    offsets = network.offsets
+    targets = network.targets
+    target_station = node_station[target]
+    parents = {source: source}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        if node_station[node] == target_station:
+            # Follow the parent pointers back to the source
+            path = [node]
+            while node != source:
+                node = parents[node]
+                path.append(node)
+            path.reverse()
+            return path
+        for edge in range(offsets[node], offsets[node + 1]):
+            next_node = targets[edge]
+            if next_node not in parents and (
+                    blocked is None or not blocked[node_station[next_node]]):
+                parents[next_node] = node
+                queue.append(next_node)
+    return None
+
+
+def find_shortest_route(network, start_info, end_info, blocked=None):
+    """
+    Find a shortest path between two (line name, index) pairs, the form
+    used by read_input
+
+    Output:
+        - the list of (line name, index) pairs of the path, None if no path
+        exists
+    """
+    source = network.get_node(*start_info)
+    target = network.get_node(*end_info)
+    if source is None or target is None:
+        raise ValueError("Station doesn't exist")
+    path = find_shortest_path(network, source, target, blocked)
+    if path is None:
+        return None
+    return [network.get_location(node) for node in path]
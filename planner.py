@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+from network import Network
+from flow import Flow_Graph
+from distribution import (
+    LARGE_AMOUNT_OF_TRAINS, count_trains, distribute_trains
+)
+from array import array
+from heapq import merge
+from itertools import repeat
+
+
+class Route_Plan:
+    """
+    Routes from START to END and the trains sent along each of them
+
+    Attributes:
+        path_cost_list (list): Contains lists, each has 3 elements with
+            the first element is a list of nodes represents the path,
+            the second element is the turn at which its first train
+            arrives and the third element is whether the path has a
+            transfer, which costs an extra turn for each following train
+        counts (list): the amount of trains sent along each path
+        assignments (array): the index of the path of every train, in
+            the order they leave START. None for large amounts of trains,
+            whose routes are only described by counts
+        predicted_turns (int): the amount of turns until the last train
+            arrives
+    """
+    def __init__(self, path_cost_list, counts, assignments,
+                 predicted_turns):
+        self.path_cost_list = path_cost_list
+        self.counts = counts
+        self.assignments = assignments
+        self.predicted_turns = predicted_turns
+
+    def get_assignments(self):
+        """
+        Get the index of the path of every train, in the order they leave
+        START. For large amounts of trains they are built from counts,
+        in the order distribute_trains would give them: by arrival, then
+        by path.
+        """
+        if self.assignments is not None:
+            return self.assignments
+        arrivals = merge(*[
+            zip(range(item[1], item[1] + count * increment, increment),
+                repeat(index))
+            for index, (item, count, increment) in enumerate(zip(
+                self.path_cost_list, self.counts,
+                [2 if item[2] else 1 for item in self.path_cost_list]
+            ))
+        ])
+        return array("i", [index for _, index in arrivals])
+
+    def get_train_paths(self):
+        """
+        Get the path of every train. The trains on the same path share
+        the same list.
+        """
+        return [self.path_cost_list[index][0]
+                for index in self.get_assignments()]
+
+    def __str__(self):
+        return "Route_Plan(paths=%s, trains=%s, predicted_turns=%s)" % (
+            len(self.path_cost_list),
+            sum(self.counts),
+            self.predicted_turns
+        )
+
+
+def get_disjoint_paths(network, start_node, end_node, limit=None):
+    """
+    Find station-disjoint paths from START to END with successive
+    shortest paths over the (line, index) nodes, so that every ride and
+    every transfer costs one turn. The nodes of a station on the same
+    line (the first and last of a circular line) share one vertex, split
+    in two by an edge with a capacity of one path, or of every path for
+    START and END.
+
+    Two paths may still cross at an interchange on different lines,
+    since the vertices of a station are only shared per line: a cheapest
+    set of paths with a turn cost for transfers and one path per station
+    has no such exact gadget. These sets are left out.
+
+    Output:
+        - a generator of the sets of paths with 1, 2, ... paths, each path
+        being a list of nodes. The sets are the cheapest ones, but not
+        always nested.
+    """
+    node_station = network.node_station
+    node_line = network.node_line
+    start_station = node_station[start_node]
+    end_station = node_station[end_node]
+    free_stations = (start_station, end_station)
+    capacity = network.station_count if limit is None else limit
+    # The nodes of a station on a line share the vertices 2g and 2g + 1
+    group_ids = {}
+    node_group = array("i", [
+        group_ids.setdefault((node_station[node], node_line[node]),
+                             len(group_ids))
+        for node in range(network.node_count)
+    ])
+    graph = Flow_Graph(2 * len(group_ids) + 1)
+    sink = 2 * len(group_ids)
+    for (station_id, _), group in group_ids.items():
+        graph.add_edge(
+            2 * group, 2 * group + 1,
+            capacity if station_id in free_stations else 1
+        )
+        if station_id == end_station:
+            graph.add_edge(2 * group + 1, sink, capacity)
+    # The node every edge leads to, to follow the paths back
+    edge_nodes = {}
+    for node in range(network.node_count):
+        here = node_station[node]
+        if here == end_station:
+            continue
+        for next_node in network.get_neighbours(node):
+            there = node_station[next_node]
+            if here != there and there == start_station:
+                continue
+            key = (node_group[node], node_group[next_node])
+            if key in edge_nodes:
+                continue
+            edge = graph.add_edge(
+                2 * key[0] + 1, 2 * key[1],
+                capacity if here == there and here in free_stations else 1,
+                1
+            )
+            edge_nodes[key] = (edge, next_node)
+    edge_nodes = dict(edge_nodes.values())
+    for _ in graph.successive_shortest_paths(2 * node_group[start_node],
+                                             sink, limit):
+        remaining = {edge: graph.get_flow(edge) for edge in edge_nodes}
+        paths = []
+        while True:
+            node = start_node
+            path = [node]
+            while node_station[node] != end_station:
+                for edge in graph.adjacency[2 * node_group[node] + 1]:
+                    if remaining.get(edge, 0) > 0:
+                        remaining[edge] -= 1
+                        node = edge_nodes[edge]
+                        path.append(node)
+                        break
+                else:
+                    break
+            if len(path) == 1:
+                break
+            paths.append(path)
+        if is_station_disjoint(network, paths, free_stations):
+            yield paths
+
+
+def is_station_disjoint(network, paths, free_stations):
+    """
+    Tell whether no station but START and END is on two of the paths
+    """
+    owners = {}
+    for index, path in enumerate(paths):
+        for node in path:
+            station_id = network.node_station[node]
+            if (station_id not in free_stations and
+                    owners.setdefault(station_id, index) != index):
+                return False
+    return True
+
+
+def get_path_cost_list(network, paths):
+    """
+    Build the path cost list of a set of node paths, sorted by cost
+    """
+    node_station = network.node_station
+    path_cost_list = [
+        [
+            path,
+            len(path) - 1,
+            any(node_station[path[index]] == node_station[path[index + 1]]
+                for index in range(len(path) - 1))
+        ]
+        for path in paths
+    ]
+    path_cost_list.sort(key=lambda item: item[1])
+    return path_cost_list
+
+
+def plan_routes(network, start_node, end_node, amount_of_trains,
+                max_paths=None):
+    """
+    Plan the routes of the trains over station-disjoint paths, keeping
+    the amount of paths that brings the last train to END the earliest
+
+    Input:
+        - network: a Network type object
+        - start_node, end_node: int type objects represent START and END
+        - amount_of_trains: an int type object
+        - max_paths: an int type object, the maximum amount of paths
+
+    Output:
+        - a Route_Plan type object, None if END can not be reached
+    """
+    if not isinstance(network, Network):
+        raise TypeError("network must be a Network type object")
+    elif not isinstance(amount_of_trains, int):
+        raise TypeError("amount_of_trains must be an int type object")
+    limit = max(1, amount_of_trains)
+    if max_paths is not None:
+        limit = min(limit, max_paths)
+    best_plan = None
+    for paths in get_disjoint_paths(network, start_node, end_node, limit):
+        path_cost_list = get_path_cost_list(network, paths)
+        counts, predicted_turns = count_trains(
+            [item[1] for item in path_cost_list],
+            [2 if item[2] else 1 for item in path_cost_list],
+            amount_of_trains
+        )
+        if (best_plan is None or
+                predicted_turns < best_plan.predicted_turns):
+            best_plan = Route_Plan(
+                path_cost_list, counts, None, predicted_turns
+            )
+        elif path_cost_list[-1][1] > best_plan.predicted_turns:
+            # Longer paths can not bring any train earlier
+            break
+    if best_plan is not None and amount_of_trains <= LARGE_AMOUNT_OF_TRAINS:
+        best_plan.assignments, _ = distribute_trains(
+            [item[1] for item in best_plan.path_cost_list],
+            [2 if item[2] else 1 for item in best_plan.path_cost_list],
+            amount_of_trains
+        )
+    return best_plan
@@ -1,54 +1,67 @@
 #!/usr/bin/env python3
-from base_graph import Base_Map, Station, Station_Line, Train
-from utility import print_error_message
+from base_graph import Base_Map, Station, Station_Line
+from contraction import load_hierarchy
+from engine import (STRATEGIES, Simulation_Engine, Simulation_State,
+                    Stalled_Error)
+from map_cache import (
+    compile_map, get_cache_name, hash_file, load_compiled_map
+)
+from network import compile_network
+from output import FULL, QUIET, SUMMARY, Turn_Writer
+from sweep import sweep_trains
+from utility import parse_location, print_error_message
+from sys import argv, stdout
 from time import time
 from math import sin, cos, atan2, pi
+from argparse import ArgumentParser
 import csv
 
 
-def process_line_block(index, content, base_map):
+def process_line_block(header, input_file, station_index):
     """
-    Process a certain block from the content that indicates
-    the name of stations that are on the same station line.
+    Process a certain block from the input file that indicates
+    the name of stations that are on the same station line. The block
+    is consumed from the file one line at a time.
 
     Input:
-        - index: an int type object represent the index of the line
-        that marks the start of the block in the content
-        - content: a list of str type objects
-        - base_map: a Base_Map type object represent the whole map
+        - header: a str type object represent the line that marks the
+        start of the block
+        - input_file: an iterator over the remaining lines of the file
+        - station_index: a dict type object that maps the name of every
+        station read so far to its Station object
 
     Output:
-        - index: the index at which the block ends
+        - line_content: the first line after the block, an empty str if
+        the end of the file is reached
         - new_line: the station line that is converted from the block
     """
-    if not isinstance(index, int):
-        raise TypeError("index must be an int type object")
-    elif not isinstance(content, list):
-        raise TypeError("content must be a list type object")
+    if not isinstance(header, str):
+        raise TypeError("header must be a str type object")
+    elif not isinstance(station_index, dict):
+        raise TypeError("station_index must be a dict type object")
     # Create a new station line
-    new_line = Station_Line(content[index][1:].strip())
-    # move to next line
-    index += 1
-    try:
-        line_content = content[index].split(":")
-        # Loop till the content of the line is no longer a number
-        while line_content[0].isdigit():
-            # Get station name
-            station_name = line_content[1].strip()
-            # Search for that station in the base map
-            search_station = base_map.get_station_by_name(station_name)
-            # Or create new one if the search failed
-            new_station = search_station if search_station else Station(
-                station_name
-            )
-            new_line.add_station(new_station)
-            index += 1
-            line_content = content[index].split(":")
-        if not new_line.check_validity():
-            print_error_message("Invalid file")
-    except (ValueError):
+    new_line = Station_Line(header[1:].strip())
+    line_content = ""
+    # Loop till the content of the line is no longer a number
+    for line_content in input_file:
+        fields = line_content.split(":")
+        if not fields[0].isdigit():
+            break
+        # Get station name
+        station_name = fields[1].strip()
+        # Search for that station in the index or create new one
+        try:
+            new_station = station_index[station_name]
+        except KeyError:
+            new_station = Station(station_name)
+            station_index[station_name] = new_station
+        new_line.add_station(new_station)
+    else:
+        # The block ends with the file
+        line_content = ""
+    if not new_line.check_validity():
         print_error_message("Invalid file")
-    return index, new_line
+    return line_content, new_line
 
 
 def initialize_amount_of_trains(line_content, base_map):
@@ -103,271 +116,133 @@ def read_input(file_name):
         raise TypeError("file_name must be a str type object")
     with open(file_name, "r") as input_file:
         base_map = Base_Map()
-        content = input_file.readlines()
-        content_length = len(content)
-        index = 0
-        while index < content_length:
-            line_content = content[index]
+        station_index = {}
+        line_content = next(input_file, "")
+        while line_content:
             if line_content.startswith("#"):
-                index, new_line = process_line_block(index, content, base_map)
-                if new_line is None:
-                    return
+                line_content, new_line = process_line_block(
+                    line_content, input_file, station_index
+                )
                 base_map.add_line(new_line)
+                continue
             elif line_content.startswith("START="):
                 start_node = process_start_end_line(line_content, base_map)
-                index += 1
             elif line_content.startswith("END="):
                 end_node = process_start_end_line(line_content, base_map, True)
-                index += 1
             elif line_content.startswith("TRAINS="):
                 amount_of_trains = initialize_amount_of_trains(line_content, base_map)
-                index += 1
-            elif line_content.isspace():
-                index += 1
-            else:
+            elif not line_content.isspace():
                 print_error_message("Invalid file")
+            line_content = next(input_file, "")
         return base_map, start_node, end_node, amount_of_trains
     return None
 
 
-def minimize(path):
-    result = [path[0]]
-    for node in path:
-        if node != result[-1]:
-            result.append(node)
-    return result
+def load_map(file_name):
+    """
+    Load a map through its compiled cache. The map file is only parsed
+    when the cache next to it is missing or was compiled from a different
+    version of the file, in which case the cache is rewritten.
 
+    Input:
+        - file_name: a str type object represents the name of the file
 
-def find_path(layers, base_map, end_info):
-    path = []
-    cur_info = end_info
-
-    for layer in reversed(layers):
-        print(layer)
-
-        for node in layer:
-            base_map.get_station_by_line(node[0], node[1]).over = 0
-            # print(len(base_map.get_line(node[0]).get_stations()), abs(node[1] - cur_info[1]))
-            if node[0] == cur_info[0]:
-                if abs(node[1]-cur_info[1]) == 1:
-                    cur_info = node
-                    path.insert(0, cur_info)
-
-                elif abs(node[1] - cur_info[1]) == len(base_map.get_line(node[0]).get_stations())-2:
-                    cur_info = node
-                    path.insert(0, cur_info)
-
-            elif base_map.get_station_by_line(node[0], node[1]) == base_map.get_station_by_line(cur_info[0], cur_info[1]):
-                cur_info = node
-                path.insert(0, cur_info)
-    print(path)
-    return path
-
-
-def find_bounding_nodes(base_map, layers, start_info):
-    bounding_nodes = []
-    for node in layers[-1]:
-        cur_node = base_map.get_station_by_line(node[0], node[1])
-        cur_conn_line = cur_node.get_conn_lines()
-
-        idx = 0
-        for i, line in enumerate(cur_conn_line):
-            all_stations = line.get_stations()
-            if line.name != node[0]:
-                idx = line.get_stations().index(cur_node)
-                if all_stations[idx].over < 2:
-                    if not (line.name == start_info[0] and idx == start_info[1]):
-                        bounding_nodes.append((line.name, idx))
-                        all_stations[idx].over += 1
-            else:
-                if node[1] > 0 and all_stations[node[1]-1].over == 0:
-                    if not (node[0] == start_info[0] and node[1]-1 == start_info[1]):
-                        bounding_nodes.append((node[0], node[1]-1))
-                        all_stations[node[1]-1].over += 1
-                elif node[1] == 0:
-                    if all_stations[0] == all_stations[-1] and all_stations[-2].over == 0:
-                        # bounding_nodes.append((node[0], len(line.get_stations())-1))
-                        bounding_nodes.append((node[0], len(all_stations)-2))
-                        all_stations[-2].over += 1
-
-                if node[1] < len(line.get_stations())-1 and all_stations[node[1]+1].over == 0:
-                    if not (node[0] == start_info[0] and node[1]+1 == start_info[1]):
-                        bounding_nodes.append((node[0], node[1]+1))
-                        all_stations[node[1]+1].over += 1
-                elif node[1] == len(all_stations)-1:
-                    if all_stations[0] == all_stations[-1] and all_stations[1].over == 0:
-                        # bounding_nodes.append((node[0], 0))
-                        bounding_nodes.append((node[0], 1))
-                        all_stations[1].over += 1
-
-    return bounding_nodes
-
-
-def bfs(base_map, train, start_info, end_info, th):
-    '''
-    find sortest path from specified train to ending station using BFS
-    '''
-    base_map.get_station_by_line(train.line, train.index).over = 1
-    layers = [[[train.line, train.index]]]
-    bounding_nodes = []
-    while end_info not in bounding_nodes:
-        bounding_nodes = find_bounding_nodes(base_map, layers, start_info)
-        if not bounding_nodes:
-            return None
-        layers.append(bounding_nodes)
-
-    path = find_path(layers, base_map, end_info)
+    Output:
+        - the same as read_input
+    """
+    if not isinstance(file_name, str):
+        raise TypeError("file_name must be a str type object")
+    digest = hash_file(file_name)
+    cache_name = get_cache_name(file_name)
+    result = load_compiled_map(cache_name, digest)
+    if result is None:
+        result = read_input(file_name)
+        try:
+            compile_map(cache_name, digest, *result)
+        except OSError:
+            pass
+    return result
 
-    try:
-        return path[1]
-    except Exception:
-        return end_info
 
+def main(file_name="delhi-metro-stations", strategy=None, mode=FULL):
+    """
+    Bring the trains of a map from START to END and write every turn
 
-def main():
-    # base_map, start_info, end_info, amount_of_trains = read_input("circular_test")
-    base_map, start_info, end_info, amount_of_trains = read_input("delhi-metro-stations")
-    base_map.get_station_by_line(start_info[0], start_info[1]).occupied = True
-    ls_trains = []
-    num_train = 0
-    compl = []
-    while len(compl) < amount_of_trains:
-        # print('complete', len(compl), 'num train:', len(ls_trains))
-        if len(ls_trains) < amount_of_trains*5:
-            train1 = Train(start_info[0], start_info[1])
-            ls_trains.append(train1)
-            train2 = Train(start_info[0], start_info[1])
-            ls_trains.append(train2)
-
-        base_map.get_station_by_line(start_info[0], start_info[1]).occupied = True
-
-        for th, train in enumerate(ls_trains):
-            if not train.done:
-                train.path.append((train.line, train.index))
-                bounding_nodes = []
-                cur_node = base_map.get_station_by_line(train.line, train.index)
-                cur_conn_line = cur_node.get_conn_lines()
-
-                for i, line in enumerate(cur_conn_line):
-                    all_stations = line.get_stations()
-                    if line.name != train.line:
-                        idx = all_stations.index(cur_node)
-                        bounding_nodes.append((line.name, idx))
-                    else:
-                        if train.index > 0 and not all_stations[train.index-1].occupied:
-                            bounding_nodes.append((train.line, train.index-1))
-                        else:
-                            if all_stations[0] == all_stations[-1] and not all_stations[-2].occupied:
-                                bounding_nodes.append((train.line, len(all_stations)-2))
-
-                        if train.index < len(line.get_stations())-1 and not all_stations[train.index+1].occupied:
-                            bounding_nodes.append((train.line, train.index+1))
-                        else:
-                            if all_stations[0] == all_stations[-1] and not all_stations[1].occupied:
-                                bounding_nodes.append((train.line, 1))
-
-                if len(bounding_nodes) == 1:
-                    # if there is only 1 possible station to move from current train
-                    new_node = base_map.get_station_by_line(bounding_nodes[0][0], bounding_nodes[0][1])
-
-                    if bounding_nodes[0] == end_info:
-                        num_train += 1
-                        compl.append(th)
-                        train.done = True
-                        train.line = bounding_nodes[0][0]
-                        train.index = bounding_nodes[0][1]
-                        cur_node.occupied = False
-                    else:
-                        if not new_node.occupied:
-                            new_node.occupied = True
-                            cur_node.occupied = False
-                            train.line = bounding_nodes[0][0]
-                            train.index = bounding_nodes[0][1]
-                        elif new_node == cur_node:
-                            # at interchange
-                            train.line = bounding_nodes[0][0]
-                            train.index = bounding_nodes[0][1]
-                elif len(bounding_nodes) > 1:
-                    # if there are more than 1 possible stations to move from current train
-                    next_node = bfs(base_map, train, start_info, end_info, th)
-                    if next_node:
-                        new_node = base_map.get_station_by_line(next_node[0], next_node[1])
-                        if next_node == end_info:
-                            # if next staion is the end staion
-                            num_train += 1
-                            compl.append(th)
-                            train.done = True
-                            cur_node.occupied = False
-                        else:
-                            if not new_node.occupied:
-                                new_node.occupied = True
-                                cur_node.occupied = False
-
-                        train.line = next_node[0]
-                        train.index = next_node[1]
-
-        # for i, train in enumerate(ls_trains):
-        #     print(i, train.line, train.index)
-        # print()
-    compl.sort()
-    print(compl)
-
-    for i in compl:
-        ls_trains[i].done = False
-        ls_trains[i].path = minimize(ls_trains[i].path)
-        ls_trains[i].path.append(end_info)
-        print(ls_trains[i].path)
-        print()
-
-    ls_stations = base_map.get_stations()
-    num_train = 0
-    cost = 0
-    start_node = base_map.get_station_by_line(start_info[0], start_info[1])
-    end_node = base_map.get_station_by_line(end_info[0], end_info[1])
-    for i in compl:
-        start_node.trains.append((i, start_info[0], start_info[1]))
-    while num_train < amount_of_trains:
-        cost += 1
-        for i in compl:
-            if not ls_trains[i].done:
-                # print(len(ls_trains[i].path), i)
-                if len(ls_trains[i].path) > 1:
-                    station_info = ls_trains[i].path[1]
-                    station = base_map.get_station_by_line(station_info[0], station_info[1])
-                    if (not station.trains) or station == end_node or station.trains[0][0] == i:
-                        pre_station_info = ls_trains[i].path[0]
-                        pre_station = base_map.get_station_by_line(pre_station_info[0], pre_station_info[1])
-                        if pre_station_info == start_info:
-                            try:
-                                pop_idx = pre_station.trains.index((i, start_info[0], start_info[1]))
-                                pre_station.trains.pop(pop_idx)
-                            except Exception:
-                                pass
-
-                        else:
-                            pre_station.trains = []
-                        if station_info == end_info:
-                            station.trains.append((i, station_info[0], station_info[1]))
-                        else:
-                            station.trains = [(i, station_info[0], station_info[1])]
-                        ls_trains[i].path.pop(0)
-                else:
-                    ls_trains[i].done = True
-                    num_train += 1
-
-        string = ''
-        for sta in ls_stations:
-            if sta.trains:
-                string += sta.name+'('+sta.trains[0][1]+':'+str(sta.trains[0][2]+1)+')'+'-'
-                for tau in sta.trains:
-                    string += 'T'+str(tau[0])
-                string += '|'
-        print(string)
-        print(len(base_map.get_station_by_line(end_info[0], end_info[1]).trains))
-        print()
-    print('cost:', cost)
-    # for i in compl:
-    #     print(ls_trains[i].path)'''
+    Input:
+        - file_name: a str type object represents the name of the file
+        - strategy: the name of the strategy in engine.STRATEGIES, the
+        strategy with the least turns if None
+        - mode: one of output.MODES, how much is written
+    """
+    base_map, start_info, end_info, amount_of_trains = load_map(file_name)
+    network = compile_network(base_map)
+    engine = Simulation_Engine(Simulation_State(
+        network, network.get_node(*start_info), network.get_node(*end_info),
+        amount_of_trains
+    ))
+    if strategy is None:
+        results = engine.benchmark(stop_at_bound=True)
+    else:
+        try:
+            results = [engine.run(strategy)]
+        except Stalled_Error as error:
+            print_error_message(error)
+    if not results or results[0] is None:
+        print_error_message("END can not be reached")
+    result = results[0]
+    writer = Turn_Writer(network, engine.state.free_stations[1], mode)
+    writer.write_results(results)
+    writer.write_trace(result.trace)
+    writer.write_cost(result.turns)
+    writer.flush()
+
+
+def main_sweep(file_name, max_trains):
+    """
+    Write the turns needed for 1 to max_trains trains, as trains,turns
+    lines
+    """
+    base_map, start_info, end_info, _ = load_map(file_name)
+    network = compile_network(base_map)
+    curve = sweep_trains(network, network.get_node(*start_info),
+                         network.get_node(*end_info), max_trains)
+    if curve is None:
+        print_error_message("END can not be reached")
+    stdout.write("".join("%s,%s\n" % (amount_of_trains, turns)
+                         for amount_of_trains, turns
+                         in enumerate(curve, 1)))
+
+
+def main_route(file_name, routes):
+    """
+    Write a shortest route for every (from, to) pair of locations, found
+    with the contraction hierarchy kept next to the map file
+
+    Input:
+        - file_name: a str type object represents the name of the file
+        - routes: a list of (from, to) pairs of "line name:index" str
+    """
+    network = compile_network(load_map(file_name)[0])
+    hierarchy = load_hierarchy(file_name, network)
+    for start_location, end_location in routes:
+        try:
+            source = network.get_node(*parse_location(start_location))
+            target = network.get_node(*parse_location(end_location))
+        except ValueError as error:
+            print_error_message(error)
+        if source is None or target is None:
+            print_error_message("Station doesn't exist")
+        path = hierarchy.find_path(source, target)
+        if path is None:
+            stdout.write("%s -> %s: unreachable\n" % (start_location,
+                                                        end_location))
+            continue
+        stdout.write("%s -> %s: %s turns\n" % (start_location, end_location,
+                                               len(path) - 1))
+        for node in path:
+            line_name, index = network.get_location(node)
+            stdout.write("    %s:%s %s\n" % (line_name, index + 1,
+                                             network.get_station_name(node)))
 
 
 def draw_tail():
@@ -545,5 +420,38 @@ def main_gui():
 
 
 if __name__ == "__main__":
-    # main()
-    main_gui()
+    parser = ArgumentParser(description="Bring trains from START to END. "
+                            "Without any argument, the positions of the "
+                            "stations are written like with --gui.")
+    parser.add_argument("file_name", nargs="?", default="delhi-metro-stations")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES),
+                        help="the strategy to run, the one with the least "
+                        "turns if not given")
+    modes = parser.add_mutually_exclusive_group()
+    modes.add_argument("--quiet", action="store_const", dest="mode",
+                       const=QUIET, default=FULL,
+                       help="only write the amount of turns")
+    modes.add_argument("--summary", action="store_const", dest="mode",
+                       const=SUMMARY, help="write the results of the "
+                       "strategies and the amount of turns")
+    modes.add_argument("--gui", action="store_true",
+                       help="write the positions of the stations to "
+                       "stations.csv instead")
+    modes.add_argument("--sweep", type=int, metavar="TRAINS",
+                       help="write the turns needed for 1 to TRAINS trains "
+                       "with the precomputed-paths strategy instead")
+    modes.add_argument("--route", nargs=2, action="append",
+                       metavar=("FROM", "TO"),
+                       help="write a shortest route between two locations "
+                       "written as line name:index instead, can be given "
+                       "many times")
+    args = parser.parse_args()
+    # Running the script alone still writes stations.csv as it always did
+    if args.gui or len(argv) == 1:
+        main_gui()
+    elif args.sweep is not None:
+        main_sweep(args.file_name, args.sweep)
+    elif args.route is not None:
+        main_route(args.file_name, args.route)
+    else:
+        main(args.file_name, args.strategy, args.mode)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+from network import Network
+from distance import Distance_Table, UNREACHABLE
+from heapq import heappush, heappop
+
+
+class Reservation_Table:
+    """
+    The stations the planned trains stand on at each turn, and the moves
+    they make between turns, shared by every train being planned.
+    START and END can hold any amount of trains.
+    """
+    def __init__(self, free_stations):
+        """
+        Input:
+            - free_stations: the ids of the stations without a capacity
+        """
+        self.free_stations = frozenset(free_stations)
+        self.stations = {}
+        self.moves = set()
+        self.last_turn = 0
+
+    def is_free(self, station_id, turn):
+        return (station_id in self.free_stations or
+                (station_id, turn) not in self.stations)
+
+    def can_move(self, here, there, turn):
+        """
+        Check whether a train can go from a station at a turn to another
+        one at the next turn: the station must be free and no train may
+        come the other way at the same time.
+        """
+        if here == there:
+            return self.is_free(there, turn + 1)
+        return (self.is_free(there, turn + 1) and
+                (turn, there, here) not in self.moves)
+
+    def reserve(self, schedule, node_station, train):
+        """
+        Reserve every station of a schedule
+
+        Input:
+            - schedule: a list of the node of the train at each turn
+            - node_station: the station id of every node
+            - train: an int type object represents the train
+        """
+        previous = None
+        for turn, node in enumerate(schedule):
+            station_id = node_station[node]
+            if station_id not in self.free_stations:
+                self.stations[station_id, turn] = train
+            if previous is not None and previous != station_id:
+                self.moves.add((turn - 1, previous, station_id))
+            previous = station_id
+        self.last_turn = max(self.last_turn, len(schedule) - 1)
+
+
+def find_timed_path(network, start_node, end_table, reservations):
+    """
+    Find the earliest schedule of a train from a node to END with A*
+    over (node, turn) pairs, waiting where the reservations require it.
+    The distance to END is the heuristic.
+
+    Input:
+        - network: a Network type object
+        - start_node: an int type object represents the node at turn 0
+        - end_table: a Distance_Table type object to END
+        - reservations: a Reservation_Table type object
+
+    Output:
+        - the list of the node of the train at each turn, None if END can
+        not be reached
+    """
+    distances = end_table.distances
+    if distances[start_node] == UNREACHABLE:
+        return None
+    node_station = network.node_station
+    end_station = end_table.end_station
+    # After every reservation is over, nothing can delay the train
+    horizon = reservations.last_turn + distances[start_node] + 1
+    parents = {(start_node, 0): None}
+    heap = [(distances[start_node], 0, start_node)]
+    while heap:
+        _, turn, node = heappop(heap)
+        here = node_station[node]
+        if here == end_station:
+            state = (node, turn)
+            schedule = []
+            while state is not None:
+                schedule.append(state[0])
+                state = parents[state]
+            schedule.reverse()
+            return schedule
+        if turn >= horizon:
+            continue
+        for next_node in (node, *network.get_neighbours(node)):
+            state = (next_node, turn + 1)
+            if (state in parents or
+                    distances[next_node] == UNREACHABLE or
+                    not reservations.can_move(
+                        here, node_station[next_node], turn)):
+                continue
+            parents[state] = (node, turn)
+            heappush(heap, (turn + 1 + distances[next_node], turn + 1,
+                            next_node))
+    return None
+
+
+def plan_cooperative_routes(network, start_node, end_node,
+                            amount_of_trains):
+    """
+    Plan every train one after the other with find_timed_path, each
+    train reserving its schedule for the following ones, so that the
+    schedules never put two trains on a station at the same turn.
+
+    Input:
+        - network: a Network type object
+        - start_node, end_node: int type objects represent START and END
+        - amount_of_trains: an int type object
+
+    Output:
+        - the list of the schedules of the trains, None if END can not
+        be reached
+    """
+    if not isinstance(network, Network):
+        raise TypeError("network must be a Network type object")
+    elif not isinstance(amount_of_trains, int):
+        raise TypeError("amount_of_trains must be an int type object")
+    end_table = Distance_Table(network, end_node)
+    node_station = network.node_station
+    reservations = Reservation_Table(
+        (node_station[start_node], end_table.end_station)
+    )
+    schedules = []
+    for train in range(amount_of_trains):
+        schedule = find_timed_path(
+            network, start_node, end_table, reservations
+        )
+        if schedule is None:
+            return None
+        reservations.reserve(schedule, node_station, train)
+        schedules.append(schedule)
+    return schedules
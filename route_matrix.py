@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+from network import Network, compile_network
+from distance import UNREACHABLE
+from read_input import load_map
+from utility import print_error_message
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from argparse import ArgumentParser
+from sys import stderr
+from time import perf_counter
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The network and destinations of the worker, set once by
+# initialize_worker
+_network = None
+_destinations = None
+
+
+def get_interchanges(network):
+    """
+    Get the stations where more than one line stops
+
+    Output:
+        - a list of station names, in the order of their ids
+    """
+    if not isinstance(network, Network):
+        raise TypeError("network must be a Network type object")
+    return [
+        name for station_id, name in enumerate(network.station_names)
+        if len({network.node_line[node] for node
+                in network.get_station_nodes(station_id)}) > 1
+    ]
+
+
+def get_station_distances(network, station_id):
+    """
+    Get the least turns from a station to every node, with a breadth
+    first search that starts from all the nodes of the station at once
+
+    Output:
+        - an array of the turns to every node, UNREACHABLE for the ones
+        that can not be reached
+    """
+    distances = array("i", [UNREACHABLE]) * network.node_count
+    queue = deque(network.get_station_nodes(station_id))
+    for node in queue:
+        distances[node] = 0
+    offsets = network.offsets
+    targets = network.targets
+    while queue:
+        node = queue.popleft()
+        next_distance = distances[node] + 1
+        for edge in range(offsets[node], offsets[node + 1]):
+            target = targets[edge]
+            if distances[target] == UNREACHABLE:
+                distances[target] = next_distance
+                queue.append(target)
+    return distances
+
+
+def get_row(network, origin, destinations):
+    """
+    Get the least turns from one station to each of destinations
+
+    Input:
+        - origin: an int type object represents the id of the station
+        - destinations: a list of station ids
+
+    Output:
+        - an array of the turns, UNREACHABLE for the stations that can
+        not be reached
+    """
+    distances = get_station_distances(network, origin)
+    return array("i", [
+        min(distances[node] for node in network.get_station_nodes(target))
+        for target in destinations
+    ])
+
+
+def initialize_worker(network, destinations):
+    global _network, _destinations
+    _network = network
+    _destinations = destinations
+
+
+def solve_origin(origin):
+    return get_row(_network, origin, _destinations)
+
+
+def build_route_matrix(network, origins, destinations, workers=None,
+                       chunk_size=8):
+    """
+    Get the least turns between every pair of an origin and a
+    destination. There is one breadth first search per origin, run on a
+    process pool, the network being sent once to each worker when it
+    starts.
+
+    Input:
+        - network: a Network type object
+        - origins, destinations: lists of station names
+        - workers: an int type object, the amount of processes, the amount
+        of CPUs if None
+        - chunk_size: an int type object, the origins sent together
+
+    Output:
+        - a NumPy int32 matrix with a row per origin and a column per
+        destination, UNREACHABLE where the destination can not be reached
+    """
+    if numpy is None:
+        raise ImportError("numpy is required for build_route_matrix")
+    elif not isinstance(network, Network):
+        raise TypeError("network must be a Network type object")
+    try:
+        origin_ids = [network.station_ids[name] for name in origins]
+        destination_ids = [network.station_ids[name] for name in destinations]
+    except KeyError as error:
+        raise ValueError("Station doesn't exist: %s" % error.args[0])
+    matrix = numpy.empty((len(origin_ids), len(destination_ids)),
+                         dtype=numpy.int32)
+    if workers == 1 or len(origin_ids) <= 1:
+        rows = (get_row(network, origin, destination_ids)
+                for origin in origin_ids)
+        for index, row in enumerate(rows):
+            matrix[index] = numpy.frombuffer(row, dtype=numpy.int32)
+        return matrix
+    with ProcessPoolExecutor(workers, initializer=initialize_worker,
+                             initargs=(network, destination_ids)) as executor:
+        rows = executor.map(solve_origin, origin_ids, chunksize=chunk_size)
+        for index, row in enumerate(rows):
+            matrix[index] = numpy.frombuffer(row, dtype=numpy.int32)
+    return matrix
+
+
+def save_route_matrix(file_name, matrix, origins, destinations):
+    """
+    Write a route matrix and the names of its stations to a compressed
+    .npz file
+    """
+    if numpy is None:
+        raise ImportError("numpy is required for save_route_matrix")
+    elif not isinstance(file_name, str):
+        raise TypeError("file_name must be a str type object")
+    elif matrix.shape != (len(origins), len(destinations)):
+        raise ValueError("matrix doesn't match the origins and destinations")
+    numpy.savez_compressed(
+        file_name,
+        matrix=matrix,
+        origins=numpy.array(origins, dtype=str),
+        destinations=numpy.array(destinations, dtype=str)
+    )
+
+
+def load_route_matrix(file_name):
+    """
+    Read a route matrix written by save_route_matrix
+
+    Output:
+        - the matrix, the list of origins and the list of destinations
+    """
+    if numpy is None:
+        raise ImportError("numpy is required for load_route_matrix")
+    elif not isinstance(file_name, str):
+        raise TypeError("file_name must be a str type object")
+    with numpy.load(file_name) as data:
+        return (data["matrix"], data["origins"].tolist(),
+                data["destinations"].tolist())
+
+
+def main():
+    parser = ArgumentParser(description="Compute the least turns between "
+                            "stations of one map")
+    parser.add_argument("file_name", help="the map file")
+    parser.add_argument("output", help="the .npz file written")
+    parser.add_argument("--origins", nargs="+", metavar="STATION",
+                        help="the origin stations, the interchanges if not "
+                        "given")
+    parser.add_argument("--destinations", nargs="+", metavar="STATION",
+                        help="the destination stations, the origins if not "
+                        "given")
+    parser.add_argument("--workers", type=int, help="the amount of "
+                        "processes, the amount of CPUs if not given")
+    args = parser.parse_args()
+    start_time = perf_counter()
+    network = compile_network(load_map(args.file_name)[0])
+    origins = args.origins or get_interchanges(network)
+    destinations = args.destinations or origins
+    try:
+        matrix = build_route_matrix(network, origins, destinations,
+                                    args.workers)
+    except ValueError as error:
+        print_error_message(error)
+    save_route_matrix(args.output, matrix, origins, destinations)
+    print("%sx%s matrix in %.3fs" % (len(origins), len(destinations),
+                                     perf_counter() - start_time),
+          file=stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+from network import Network
+from occupancy import Occupancy_Map
+from bisect import bisect, insort
+from heapq import heapify, heappop, heappush
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def pack_paths(paths):
+    """
+    Concatenate paths into one array, the path number p being
+    nodes[offsets[p]:offsets[p + 1]]
+    """
+    offsets = numpy.zeros(len(paths) + 1, dtype=numpy.int64)
+    offsets[1:] = numpy.cumsum([len(path) for path in paths])
+    nodes = numpy.fromiter(
+        (node for path in paths for node in path),
+        dtype=numpy.int64, count=int(offsets[-1])
+    )
+    return offsets, nodes
+
+
+def simulate_vectorized(network, paths, assignments, free_stations,
+                        on_turn=None):
+    """
+    Move trains along their paths with the state of the whole fleet kept
+    in NumPy arrays, every turn being resolved with array operations:
+
+    - a train moves to the next node of its path if the station is free,
+    it is a transfer, or the train standing there moves away this turn
+    - when several trains want the same station, the lowest train wins
+    - a train waits when the train ahead of it waits, which is resolved
+    for whole queues at once by pointer jumping
+    - the trains of a path are released from START one after the other:
+    a train is only looked at once the train before it on its path has
+    moved, so the trains still held cost nothing
+
+    Unlike simulate_events, a train may always enter a station in the
+    same turn its occupant leaves it. simulate_events goes through the
+    trains in order, so there a train lower than the occupant waits one
+    more turn, and the two can end on different turns.
+
+    Input:
+        - network: a Network type object
+        - paths: a list of lists of nodes, every path starting at START
+        - assignments: the index of the path of every train
+        - free_stations: the stations that can hold any amount of trains
+        - on_turn: a function called after every turn with the turn, the
+        array of trains that moved and the array of their new nodes
+
+    Output:
+        - the amount of turns until every train arrived
+    """
+    if numpy is None:
+        raise ImportError("numpy is required for simulate_vectorized")
+    if not isinstance(network, Network):
+        raise TypeError("network must be a Network type object")
+    node_station = numpy.frombuffer(network.node_station, dtype=numpy.int32)
+    path_offsets, path_nodes = pack_paths(paths)
+    assignments = numpy.asarray(assignments, dtype=numpy.int64)
+    starts = path_offsets[assignments]
+    lasts = path_offsets[assignments + 1] - 1
+    cursors = starts.copy()
+    free = numpy.zeros(network.station_count, dtype=bool)
+    free[list(free_stations)] = True
+    # The trains of path p, in order, are queue[queue_offsets[p]:
+    # queue_offsets[p + 1]], the ones before released[p] being released
+    moving = numpy.flatnonzero(starts < lasts)
+    queue = moving[numpy.argsort(assignments[moving], kind="stable")]
+    queue_offsets = numpy.zeros(len(paths) + 1, dtype=numpy.int64)
+    queue_offsets[1:] = numpy.cumsum(
+        numpy.bincount(assignments[moving], minlength=len(paths))
+    )
+    queued = numpy.flatnonzero(queue_offsets[1:] > queue_offsets[:-1])
+    released = queue_offsets[:-1].copy()
+    released[queued] += 1
+    active = numpy.sort(queue[queue_offsets[queued]])
+    turn = 0
+    while active.size:
+        turn += 1
+        here = node_station[path_nodes[cursors[active]]]
+        there = node_station[path_nodes[cursors[active] + 1]]
+        transfer = here == there
+        # Lowest train wins each contested station, active is sorted
+        contested = ~transfer & ~free[there]
+        winners = numpy.zeros(active.size, dtype=bool)
+        winners[~contested] = True
+        contested_index = numpy.flatnonzero(contested)
+        _, first = numpy.unique(there[contested_index], return_index=True)
+        winners[contested_index[first]] = True
+        # 1: moves, 0: waits, -1: moves if the train ahead moves
+        status = numpy.where(winners, -1, 0)
+        status[transfer | (winners & ~contested)] = 1
+        # The position in active of the train standing on each station
+        position = numpy.full(network.station_count, -1, dtype=numpy.int64)
+        position[here] = numpy.arange(active.size)
+        ahead = position[there]
+        status[(status == -1) & (ahead < 0)] = 1
+        # A train ahead that transfers keeps its station
+        status[(status == -1) & (ahead >= 0) & transfer[ahead]] = 0
+        pending = numpy.flatnonzero(status == -1)
+        # Pointer jumping halves every queue of trains at each step, what
+        # is left after that is a cycle of trains waiting for each other
+        for _ in range(active.size.bit_length() + 1):
+            if not pending.size:
+                break
+            ahead_status = status[ahead[pending]]
+            resolved = ahead_status >= 0
+            status[pending[resolved]] = ahead_status[resolved]
+            pending = pending[~resolved]
+            ahead[pending] = ahead[ahead[pending]]
+        status[pending] = 0
+        movers = active[status == 1]
+        cursors[movers] += 1
+        if on_turn is not None:
+            on_turn(turn, movers, path_nodes[cursors[movers]])
+        active = active[cursors[active] < lasts[active]]
+        # Release the next train of every path whose last released train
+        # has left its first node
+        queued = queued[released[queued] < queue_offsets[queued + 1]]
+        last_released = queue[released[queued] - 1]
+        ready = queued[cursors[last_released] > starts[last_released]]
+        if ready.size:
+            active = numpy.union1d(active, queue[released[ready]])
+            released[ready] += 1
+    return turn
+
+
+def simulate_events(network, paths, assignments, free_stations,
+                    on_turn=None):
+    """
+    Move trains along their paths like flow.replay_paths, every turn
+    going through the trains in order, but only looking at the trains
+    that can move: a train blocked by another one waits on that station
+    and is woken when the station is left, and a train that arrived is
+    never looked at again. A turn costs about as much as its moves.
+
+    Input:
+        - the same as simulate_vectorized, the lists given to on_turn
+        being Python lists
+
+    Output:
+        - the amount of turns until every train arrived
+    """
+    if not isinstance(network, Network):
+        raise TypeError("network must be a Network type object")
+    node_station = network.node_station
+    free_stations = frozenset(free_stations)
+    train_paths = [paths[index] for index in assignments]
+    cursors = [0] * len(train_paths)
+    occupancy = Occupancy_Map(network.station_count)
+    occupied = occupancy.stations
+    # The trains waiting for each station, sorted
+    waiters = {}
+    candidates = [train for train, path in enumerate(train_paths)
+                  if len(path) > 1]
+    turn = 0
+    while candidates:
+        turn += 1
+        later = []
+        movers = []
+        heapify(candidates)
+        while candidates:
+            train = heappop(candidates)
+            path = train_paths[train]
+            cursor = cursors[train]
+            here = node_station[path[cursor]]
+            there = node_station[path[cursor + 1]]
+            if (here != there and there not in free_stations and
+                    occupied[there]):
+                insort(waiters.setdefault(there, []), train)
+                continue
+            if here != there and here not in free_stations:
+                occupied[here] = 0
+                waiting = waiters.get(here)
+                if waiting:
+                    # The first waiter after this train still gets its
+                    # turn now, the others can only move next turn
+                    index = bisect(waiting, train)
+                    if index < len(waiting):
+                        heappush(candidates, waiting.pop(index))
+                    else:
+                        later.append(waiting.pop(0))
+            if there not in free_stations:
+                occupied[there] = 1
+            cursors[train] = cursor + 1
+            movers.append(train)
+            if cursor + 2 < len(path):
+                later.append(train)
+        if on_turn is not None:
+            on_turn(turn, movers, [train_paths[train][cursors[train]]
+                                   for train in movers])
+        candidates = later
+    return turn
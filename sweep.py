@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+from network import Network
+from distribution import count_trains
+from planner import get_disjoint_paths, get_path_cost_list
+from heapq import heapify, heapreplace
+
+
+def get_leave_turns(node_station, path, enter_turns):
+    """
+    Get, for every index of a path, the turn at which a train left the
+    station of that index, given the turns at which it entered each node
+    """
+    leave_turns = [None] * len(path)
+    leave_turn = None
+    for index in range(len(path) - 1, -1, -1):
+        if (index + 1 < len(path) and
+                node_station[path[index]] != node_station[path[index + 1]]):
+            leave_turn = enter_turns[index + 1]
+        leave_turns[index] = leave_turn
+    return leave_turns
+
+
+def follow_path(node_station, free_stations, path, leave_turns):
+    """
+    Get the turns at which a train enters each node of a path when it
+    follows the previous train on that path, which left each station at
+    leave_turns (None if no train went before). The paths being station
+    disjoint, no other train is in the way.
+    """
+    enter_turns = [0]
+    for index in range(len(path) - 1):
+        turn = enter_turns[index] + 1
+        there = node_station[path[index + 1]]
+        if (leave_turns is not None and there not in free_stations and
+                node_station[path[index]] != there):
+            turn = max(turn, leave_turns[index + 1])
+        enter_turns.append(turn)
+    return enter_turns
+
+
+class Trains_Sweep:
+    """
+    The turns needed by the precomputed-paths strategy for 1, 2, ...
+    trains. The sets of station-disjoint paths are found once, and while
+    the set kept stays the same each new train is only added behind the
+    previous train on its path: trains are sent in order, so a new train
+    never delays the trains before it.
+    """
+    def __init__(self, network, start_node, end_node):
+        if not isinstance(network, Network):
+            raise TypeError("network must be a Network type object")
+        self.network = network
+        self.start_node = start_node
+        self.end_node = end_node
+        self.free_stations = (network.node_station[start_node],
+                              network.node_station[end_node])
+        self.path_sets = []
+        self._paths = None
+
+    def get_path_set(self, index, limit):
+        """
+        Get the path cost list of the set with index + 1 paths, None if
+        there are not that many disjoint paths
+        """
+        if self._paths is None:
+            self._paths = get_disjoint_paths(
+                self.network, self.start_node, self.end_node, limit
+            )
+        while len(self.path_sets) <= index:
+            try:
+                paths = next(self._paths)
+            except StopIteration:
+                return None
+            self.path_sets.append(get_path_cost_list(self.network, paths))
+        return self.path_sets[index]
+
+    def choose_path_set(self, amount_of_trains, limit):
+        """
+        Choose the set of paths the same way plan_routes does
+
+        Output:
+            - the index of the set, None if END can not be reached
+        """
+        best_index = None
+        best_turns = None
+        for index in range(max(1, amount_of_trains)):
+            path_cost_list = self.get_path_set(index, limit)
+            if path_cost_list is None:
+                break
+            _, predicted_turns = count_trains(
+                [item[1] for item in path_cost_list],
+                [2 if item[2] else 1 for item in path_cost_list],
+                amount_of_trains
+            )
+            if best_index is None or predicted_turns < best_turns:
+                best_index = index
+                best_turns = predicted_turns
+            elif path_cost_list[-1][1] > best_turns:
+                break
+        return best_index
+
+    def run(self, max_trains):
+        """
+        Input:
+            - max_trains: an int type object
+
+        Output:
+            - the list of the turns needed for 1 to max_trains trains, None
+            if END can not be reached
+        """
+        if not isinstance(max_trains, int):
+            raise TypeError("max_trains must be an int type object")
+        node_station = self.network.node_station
+        curve = []
+        current_index = None
+        for amount_of_trains in range(1, max_trains + 1):
+            index = self.choose_path_set(amount_of_trains, max_trains)
+            if index is None:
+                return None
+            path_cost_list = self.path_sets[index]
+            if index != current_index:
+                # Another set of paths, the trains are sent again
+                current_index = index
+                heap = [(item[1], path) for path, item
+                        in enumerate(path_cost_list)]
+                heapify(heap)
+                leave_turns = [None] * len(path_cost_list)
+                turns = 0
+                sent = 0
+            while sent < amount_of_trains:
+                cost, path_index = heap[0]
+                increment = 2 if path_cost_list[path_index][2] else 1
+                heapreplace(heap, (cost + increment, path_index))
+                path = path_cost_list[path_index][0]
+                enter_turns = follow_path(node_station, self.free_stations,
+                                          path, leave_turns[path_index])
+                leave_turns[path_index] = get_leave_turns(
+                    node_station, path, enter_turns
+                )
+                turns = max(turns, enter_turns[-1])
+                sent += 1
+            curve.append(turns)
+        return curve
+
+
+def sweep_trains(network, start_node, end_node, max_trains):
+    """
+    Get the turns needed for 1 to max_trains trains with a Trains_Sweep
+    """
+    return Trains_Sweep(network, start_node, end_node).run(max_trains)
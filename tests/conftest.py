@@ -0,0 +1,46 @@
+import os
+import shutil
+import sys
+import pytest
+
+# The modules live at the root of the repository
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from network import compile_network  # noqa: E402
+from read_input import load_map  # noqa: E402
+
+
+class Scenario:
+    """
+    A bundled map loaded from a copy, so that its compiled cache is not
+    written into the repository
+    """
+    def __init__(self, file_name):
+        self.file_name = file_name
+        (self.base_map, self.start_info, self.end_info,
+         self.amount_of_trains) = load_map(file_name)
+        self.network = compile_network(self.base_map)
+        self.start_node = self.network.get_node(*self.start_info)
+        self.end_node = self.network.get_node(*self.end_info)
+
+
+@pytest.fixture
+def copy_map(tmp_path):
+    """
+    Copy a bundled map into the temporary directory of the test and
+    give the name of the copy
+    """
+    def copy(name):
+        file_name = str(tmp_path / name)
+        shutil.copy(os.path.join(ROOT, name), file_name)
+        return file_name
+    return copy
+
+
+@pytest.fixture
+def load_scenario(copy_map):
+    """
+    Load a copy of a bundled map as a Scenario
+    """
+    return lambda name: Scenario(copy_map(name))
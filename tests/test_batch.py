@@ -0,0 +1,27 @@
+from batch import read_scenarios, run_batch
+from engine import Simulation_State
+import pytest
+
+
+def test_negative_trains_are_rejected(tmp_path, load_scenario):
+    scenario_file = tmp_path / "scenarios.csv"
+    scenario_file.write_text("start,end,trains\nBlue:1,Green:7,-1\n")
+    with pytest.raises(ValueError):
+        read_scenarios(str(scenario_file))
+    scenario = load_scenario("map_test")
+    with pytest.raises(ValueError):
+        Simulation_State(scenario.network, scenario.start_node,
+                         scenario.end_node, -1)
+
+
+def test_scenarios_are_solved_inline(tmp_path, load_scenario):
+    scenario_file = tmp_path / "scenarios.jsonl"
+    scenario_file.write_text(
+        '{"start": "Blue:1", "end": "Green:7", "trains": 30, '
+        '"strategy": "precomputed-paths"}\n'
+        '{"start": "Blue:1", "end": "Blue:1", "trains": 3}\n'
+    )
+    network = load_scenario("map_test").network
+    results = list(run_batch(network, read_scenarios(str(scenario_file)),
+                             workers=1))
+    assert [result["turns"] for result in results] == [21, 0]
@@ -0,0 +1,24 @@
+from bounds import estimate_lower_bound
+from engine import Simulation_Engine, Simulation_State
+
+
+def test_no_trains_need_no_turns(load_scenario):
+    scenario = load_scenario("map_test")
+    lower_bound = estimate_lower_bound(scenario.network, scenario.start_node,
+                                       scenario.end_node, 0)
+    assert lower_bound.value == 0
+    assert lower_bound.shortest > 0
+    result = Simulation_Engine(Simulation_State(
+        scenario.network, scenario.start_node, scenario.end_node, 0
+    )).run("precomputed-paths")
+    assert result.turns == 0
+    assert lower_bound.get_gap(result.turns) == 0
+
+
+def test_bound_is_below_every_strategy(load_scenario):
+    scenario = load_scenario("delhi-metro-stations")
+    engine = Simulation_Engine(Simulation_State(
+        scenario.network, scenario.start_node, scenario.end_node, 30
+    ))
+    for result in engine.benchmark():
+        assert result.lower_bound.value <= result.turns
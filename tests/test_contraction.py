@@ -0,0 +1,43 @@
+from contraction import build_hierarchy, load_hierarchy
+from distance import Distance_Table, UNREACHABLE
+import os
+import pytest
+
+MAPS = ["delhi-metro-stations", "map", "map_test", "circular_test"]
+
+
+@pytest.mark.parametrize("file_name", MAPS)
+def test_queries_match_distance_table(load_scenario, file_name):
+    network = load_scenario(file_name).network
+    hierarchy = build_hierarchy(network)
+    for target in range(0, network.node_count, 3):
+        table = Distance_Table(network, target)
+        for source in range(network.node_count):
+            shortest = table.get_distance(source)
+            path = hierarchy.find_path(source, target)
+            if shortest == UNREACHABLE:
+                assert hierarchy.find_distance(source, target) is None
+                assert path is None
+                continue
+            assert hierarchy.find_distance(source, target) == shortest
+            assert len(path) - 1 == shortest
+            assert path[0] == source
+            assert (network.node_station[path[-1]] ==
+                    network.node_station[target])
+            for node, next_node in zip(path, path[1:]):
+                assert next_node in network.get_neighbours(node)
+
+
+def test_hierarchy_is_written_next_to_the_map(load_scenario):
+    scenario = load_scenario("map_test")
+    file_name = scenario.file_name
+    network = scenario.network
+    hierarchy = load_hierarchy(file_name, network)
+    assert os.path.exists(file_name + ".ch")
+    loaded = load_hierarchy(file_name, network)
+    assert loaded.up_targets == hierarchy.up_targets
+    assert loaded.down_sources == hierarchy.down_sources
+    for source in range(network.node_count):
+        for target in range(network.node_count):
+            assert (loaded.find_distance(source, target) ==
+                    hierarchy.find_distance(source, target))
@@ -0,0 +1,112 @@
+from distance import Distance_Table, UNREACHABLE
+from engine import Simulation_Engine, Simulation_State
+from live_network import Live_Distances
+import random
+import pytest
+
+MAPS = ["delhi-metro-stations", "map", "map_test", "circular_test"]
+
+
+@pytest.mark.parametrize("file_name", MAPS)
+def test_repair_matches_rebuild(load_scenario, file_name):
+    scenario = load_scenario(file_name)
+    network = scenario.network
+    end_node = scenario.end_node
+    table = Distance_Table(network, end_node)
+    blocked_stations = set()
+    blocked_lines = set()
+    generator = random.Random(file_name)
+    for _ in range(60):
+        if generator.random() < 0.7:
+            station_id = generator.randrange(network.station_count)
+            if station_id in blocked_stations:
+                table.unblock_station(station_id)
+                blocked_stations.remove(station_id)
+            else:
+                table.block_station(station_id)
+                blocked_stations.add(station_id)
+        else:
+            line_id = generator.randrange(len(network.line_names))
+            if line_id in blocked_lines:
+                table.unblock_line(line_id)
+                blocked_lines.remove(line_id)
+            else:
+                table.block_line(line_id)
+                blocked_lines.add(line_id)
+        rebuilt = Distance_Table(network, end_node, blocked_stations,
+                                 blocked_lines)
+        assert table.distances == rebuilt.distances
+
+
+def test_live_distances_follow_the_map(load_scenario):
+    scenario = load_scenario("delhi-metro-stations")
+    base_map = scenario.base_map
+    network = scenario.network
+    end_node = scenario.end_node
+    live = Live_Distances(base_map, network)
+    table = live.get_table(end_node)
+    generator = random.Random(0)
+    station_names = list(network.station_names)
+    line_names = list(network.line_names)
+    for _ in range(40):
+        if generator.random() < 0.7:
+            name = generator.choice(station_names)
+            if not base_map.close_station(name):
+                base_map.reopen_station(name)
+        else:
+            name = generator.choice(line_names)
+            if not base_map.suspend_line(name):
+                base_map.resume_line(name)
+        rebuilt = Distance_Table(
+            network, end_node,
+            [network.station_ids[name] for name in base_map.closed_stations],
+            [network.line_ids[name] for name in base_map.suspended_lines]
+        )
+        assert table.distances == rebuilt.distances
+
+
+# The turns of greedy-bfs, which routes every train with Distance_Table,
+# at the amount of trains of each map
+GREEDY_TURNS = {
+    "delhi-metro-stations": 66,
+    "map": 81,
+    "map_test": 35,
+    "circular_test": 30,
+    "test_2": 30,
+}
+
+
+@pytest.mark.parametrize("file_name", sorted(GREEDY_TURNS))
+def test_greedy_routing_turns(load_scenario, file_name):
+    scenario = load_scenario(file_name)
+    result = Simulation_Engine(Simulation_State(
+        scenario.network, scenario.start_node, scenario.end_node,
+        scenario.amount_of_trains
+    )).run("greedy-bfs")
+    assert result.turns == GREEDY_TURNS[file_name]
+
+
+def test_block_and_unblock_shortest_route(load_scenario):
+    scenario = load_scenario("delhi-metro-stations")
+    network = scenario.network
+    table = Distance_Table(network, scenario.end_node)
+    original = table.distances[:]
+    # Block the stations of a shortest route from START one by one
+    node = scenario.start_node
+    blocked = []
+    while table.get_distance(node):
+        node = table.get_next_node(node)
+        station_id = network.node_station[node]
+        if station_id not in blocked and table.get_distance(node):
+            blocked.append(station_id)
+    for station_id in blocked:
+        repaired = table.block_station(station_id)
+        assert 0 < repaired < network.node_count
+        for node in network.get_station_nodes(station_id):
+            assert table.get_distance(node) == UNREACHABLE
+        assert table.block_station(station_id) == 0
+    assert (table.get_distance(scenario.start_node) >
+            original[scenario.start_node])
+    for station_id in reversed(blocked):
+        table.unblock_station(station_id)
+    assert table.distances == original
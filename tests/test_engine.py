@@ -0,0 +1,50 @@
+from engine import (STRATEGIES, Greedy_Strategy, Simulation_Engine,
+                    Simulation_State, Stalled_Error, Strategy)
+from move_trace import Move_Trace
+import pytest
+
+
+@pytest.mark.parametrize("strategy", sorted(STRATEGIES))
+def test_trains_at_end_already_arrived(load_scenario, strategy):
+    scenario = load_scenario("map_test")
+    network = scenario.network
+    for end_node in network.get_station_nodes(
+            network.node_station[scenario.start_node]):
+        engine = Simulation_Engine(Simulation_State(
+            network, scenario.start_node, end_node, 5
+        ))
+        result = engine.run(strategy)
+        assert result.turns == 0
+        assert len(result.trace) == 5
+
+
+def test_trains_left_before_end_are_rejected(load_scenario):
+    scenario = load_scenario("map_test")
+
+    class Stalled_Strategy(Strategy):
+        name = "stalled"
+
+        def run(self, state):
+            return Move_Trace([state.start_node] * state.amount_of_trains)
+
+    engine = Simulation_Engine(Simulation_State(
+        scenario.network, scenario.start_node, scenario.end_node, 3
+    ))
+    with pytest.raises(Stalled_Error):
+        engine.run(Stalled_Strategy())
+    results = engine.benchmark([Stalled_Strategy(), "precomputed-paths"])
+    assert [result.strategy for result in results] == ["precomputed-paths"]
+
+
+def test_greedy_keeps_the_better_release_rule(load_scenario):
+    scenario = load_scenario("delhi-metro-stations")
+    state = Simulation_State(scenario.network, scenario.start_node,
+                             scenario.end_node, scenario.amount_of_trains)
+    strategy = Greedy_Strategy()
+    result = Simulation_Engine(state).run(strategy)
+    assert result.turns == min(
+        strategy.simulate(state, detours).get_turns()
+        for detours in (True, False)
+    )
+    # The spare trains of the former release rule took 69 turns
+    assert result.turns <= 69
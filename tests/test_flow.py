@@ -0,0 +1,23 @@
+from engine import Simulation_Engine, Simulation_State
+from flow import replay_paths, solve_flow_schedule
+
+
+def test_replay_stops_when_routes_cross(load_scenario):
+    network = load_scenario("test_2").network
+    free_stations = (network.node_station[0], network.node_station[20])
+    paths = [[4, 5, 6, 7, 8], [8, 7, 6, 5, 4]]
+    assert replay_paths(network, paths, free_stations) is None
+    schedules = replay_paths(network, paths[:1], free_stations)
+    assert schedules == [paths[0]]
+
+
+def test_schedule_is_minimal_only_when_proven(load_scenario):
+    scenario = load_scenario("delhi-metro-stations")
+    result = solve_flow_schedule(scenario.network, scenario.start_node,
+                                 scenario.end_node, 30)
+    assert result.lower_bound <= result.turns
+    assert result.optimal == (result.turns == result.lower_bound)
+    engine = Simulation_Engine(Simulation_State(
+        scenario.network, scenario.start_node, scenario.end_node, 30
+    ))
+    assert engine.run("flow-based").turns == result.turns
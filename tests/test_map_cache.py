@@ -0,0 +1,44 @@
+from map_cache import (HEADER, LOCATION, get_cache_name, hash_file,
+                       load_compiled_map)
+from read_input import load_map
+import pytest
+
+
+def get_designation(result):
+    _, start_info, end_info, amount_of_trains = result
+    return start_info, end_info, amount_of_trains
+
+
+def test_cache_matches_parsing(copy_map):
+    file_name = copy_map("delhi-metro-stations")
+    parsed = load_map(file_name)
+    cached = load_compiled_map(get_cache_name(file_name),
+                               hash_file(file_name))
+    assert get_designation(cached) == get_designation(parsed)
+
+
+@pytest.mark.parametrize("location", [
+    (99, 0, 0, 0, 30),
+    (-1, 0, 0, 0, 30),
+    (0, 9999, 0, 0, 30),
+    (0, 0, 0, -5, 30),
+])
+def test_damaged_designation_falls_back_to_parsing(copy_map, location):
+    file_name = copy_map("delhi-metro-stations")
+    parsed = load_map(file_name)
+    cache_name = get_cache_name(file_name)
+    with open(cache_name, "r+b") as cache_file:
+        cache_file.seek(-LOCATION.size, 2)
+        cache_file.write(LOCATION.pack(*location))
+    assert load_compiled_map(cache_name, hash_file(file_name)) is None
+    assert get_designation(load_map(file_name)) == get_designation(parsed)
+
+
+def test_truncated_cache_falls_back_to_parsing(copy_map):
+    file_name = copy_map("delhi-metro-stations")
+    parsed = load_map(file_name)
+    cache_name = get_cache_name(file_name)
+    with open(cache_name, "r+b") as cache_file:
+        cache_file.truncate(HEADER.size + 10)
+    assert load_compiled_map(cache_name, hash_file(file_name)) is None
+    assert get_designation(load_map(file_name)) == get_designation(parsed)
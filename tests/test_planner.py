@@ -0,0 +1,42 @@
+from distance import Distance_Table, UNREACHABLE
+from planner import plan_routes
+import random
+import pytest
+
+MAPS = ["delhi-metro-stations", "map", "map_test", "test_2", "circular_test"]
+
+
+@pytest.mark.parametrize("file_name", MAPS)
+def test_one_train_takes_the_shortest_route(load_scenario, file_name):
+    network = load_scenario(file_name).network
+    generator = random.Random(file_name)
+    for _ in range(100):
+        start_node = generator.randrange(network.node_count)
+        end_node = generator.randrange(network.node_count)
+        if (network.node_station[start_node] ==
+                network.node_station[end_node]):
+            continue
+        shortest = Distance_Table(network, end_node).get_distance(start_node)
+        plan = plan_routes(network, start_node, end_node, 1)
+        if shortest == UNREACHABLE:
+            assert plan is None
+        else:
+            assert plan.predicted_turns == shortest
+
+
+def test_direct_line_is_preferred_to_a_transfer(load_scenario):
+    scenario = load_scenario("map_test")
+    plan = plan_routes(scenario.network, scenario.start_node,
+                       scenario.end_node, 1)
+    assert plan.predicted_turns == 6
+
+
+@pytest.mark.parametrize("amount_of_trains", [1, 5, 30, 1000])
+def test_assignments_are_rebuilt_from_counts(load_scenario,
+                                             amount_of_trains):
+    scenario = load_scenario("delhi-metro-stations")
+    plan = plan_routes(scenario.network, scenario.start_node,
+                       scenario.end_node, amount_of_trains)
+    assignments = plan.assignments
+    plan.assignments = None
+    assert plan.get_assignments() == assignments
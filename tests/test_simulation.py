@@ -0,0 +1,41 @@
+from move_trace import Move_Trace
+from planner import plan_routes
+from simulation import simulate_events, simulate_vectorized
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+MAPS = ["delhi-metro-stations", "map", "map_test", "test_2", "circular_test"]
+
+
+def get_plan(scenario, amount_of_trains):
+    network = scenario.network
+    plan = plan_routes(network, scenario.start_node, scenario.end_node,
+                       amount_of_trains)
+    free_stations = (network.node_station[scenario.start_node],
+                     network.node_station[scenario.end_node])
+    return ([item[0] for item in plan.path_cost_list],
+            plan.get_assignments(), free_stations)
+
+
+@pytest.mark.parametrize("file_name", MAPS)
+@pytest.mark.parametrize("amount_of_trains", [1, 30, 500])
+def test_vectorized_matches_events(load_scenario, file_name,
+                                   amount_of_trains):
+    scenario = load_scenario(file_name)
+    network = scenario.network
+    paths, assignments, free_stations = get_plan(scenario, amount_of_trains)
+    trace = Move_Trace(paths[index][0] for index in assignments)
+
+    def record(turn, trains, nodes):
+        for train, node in zip(trains.tolist(), nodes.tolist()):
+            trace.add_move(train, turn, node)
+
+    turns = simulate_vectorized(network, paths, assignments, free_stations,
+                                record)
+    assert turns == simulate_events(network, paths, assignments,
+                                    free_stations)
+    assert trace.get_turns() == turns
+    assert not trace.find_conflicts(network.node_station, free_stations)
+    for train, index in enumerate(assignments):
+        assert trace.get_schedule(train)[-1] == paths[index][-1]
@@ -0,0 +1,19 @@
+from engine import Simulation_Engine, Simulation_State
+from sweep import sweep_trains
+import pytest
+
+MAPS = ["delhi-metro-stations", "map", "map_test", "test_2", "circular_test"]
+
+
+@pytest.mark.parametrize("file_name", MAPS)
+def test_sweep_matches_runs_from_scratch(load_scenario, file_name):
+    scenario = load_scenario(file_name)
+    curve = sweep_trains(scenario.network, scenario.start_node,
+                         scenario.end_node, 40)
+    assert len(curve) == 40
+    for amount_of_trains, turns in enumerate(curve, 1):
+        result = Simulation_Engine(Simulation_State(
+            scenario.network, scenario.start_node, scenario.end_node,
+            amount_of_trains
+        )).run("precomputed-paths")
+        assert turns == result.turns
@@ -5,3 +5,19 @@ from sys import stderr
 def print_error_message(*args):
     print(*args, file=stderr)
     exit(1)
+
+
+def parse_location(location):
+    """
+    Parse a "line name:index" str, the index starting at 1 as in the map
+    files
+
+    Output:
+        - a (line_name, index) tuple, the index starting at 0
+    """
+    if not isinstance(location, str):
+        raise TypeError("location must be a str type object")
+    line_name, _, index = location.rpartition(":")
+    if not line_name or not index.strip().isdigit():
+        raise ValueError("location must be written as line name:index")
+    return line_name.strip(), int(index) - 1